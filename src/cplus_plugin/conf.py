@@ -241,6 +241,7 @@ class Settings(enum.Enum):
 
     # Processing option
     PROCESSING_TYPE = "processing_type"
+    QUANTIZE_OUTPUTS = "quantize_outputs"
 
     # REPORT OPTIONS
     USE_CUSTOM_METRICS = "use_custom_metrics"
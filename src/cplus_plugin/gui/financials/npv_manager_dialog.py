@@ -24,7 +24,7 @@ from ...definitions.defaults import ICON_PATH, USER_DOCUMENTATION_SITE
 from ...models.base import Activity
 from ...models.financial import ActivityNpv, ActivityNpvCollection, NpvParameters
 from .npv_financial_model import NpvFinancialModel
-from ...lib.financials import compute_discount_value
+from ...lib.financials import compute_discount_value, compute_discount_values
 from ...utils import FileUtils, open_documentation, tr
 
 
@@ -381,26 +381,67 @@ class NpvPwlManagerDialog(QtWidgets.QDialog, WidgetUi):
         discounted_value = compute_discount_value(
             revenue, cost, row + 1, self.sb_discount.value()
         )
+        self._set_discounted_value(row, discounted_value)
+
+        if not self.cb_manual_npv.isChecked():
+            self.compute_npv()
+
+    def _set_discounted_value(self, row: int, discounted_value: float):
+        """Sets the rounded discounted value in the given row number.
+
+        :param row: Row number to set the discounted value.
+        :type row: int
+
+        :param discounted_value: Computed discounted value.
+        :type discounted_value: float
+        """
         rounded_discounted_value = round(discounted_value, self.NUM_DECIMAL_PLACES)
         discounted_value_index = self._npv_model.index(row, 3)
         self._npv_model.setData(
             discounted_value_index, rounded_discounted_value, QtCore.Qt.EditRole
         )
 
-        if not self.cb_manual_npv.isChecked():
-            self.compute_npv()
-
     def update_all_discounted_values(self):
         """Updates all discounted values that had already been
         computed using the revised discount rate.
+
+        The discounted values are computed in one pass and the NPV
+        is only recomputed once all the rows have been updated.
         """
+        rows = []
+        revenues = []
+        costs = []
         for row in range(self._npv_model.rowCount()):
             discount_value = self._npv_model.data(
                 self._npv_model.index(row, 3), QtCore.Qt.EditRole
             )
             if discount_value is None:
                 continue
-            self.update_discounted_value(row)
+
+            revenue = self._npv_model.data(
+                self._npv_model.index(row, 1), QtCore.Qt.EditRole
+            )
+            cost = self._npv_model.data(
+                self._npv_model.index(row, 2), QtCore.Qt.EditRole
+            )
+            if revenue is None and cost is None:
+                continue
+
+            rows.append(row)
+            revenues.append(0.0 if revenue is None else revenue)
+            costs.append(0.0 if cost is None else cost)
+
+        if len(rows) == 0:
+            return
+
+        discounted_values = compute_discount_values(
+            revenues, costs, self.sb_discount.value(), [row + 1 for row in rows]
+        )
+        for row, discounted_value in zip(rows, discounted_values):
+            self._set_discounted_value(row, discounted_value)
+
+        if not self.cb_manual_npv.isChecked():
+            self.compute_npv()
 
     def on_discount_rate_changed(self, discount_rate: float):
         """Slot raised when discount rate has changed.
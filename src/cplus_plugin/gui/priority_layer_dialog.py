@@ -86,7 +86,7 @@ class PriorityLayerDialog(QtWidgets.QDialog, DialogUi):
                     self.map_layer_box.currentLayer() is not None
                     or (
                         self.map_layer_file_widget.filePath() is not None
-                        and self.map_layer_file_widget.filePath() is not ""
+                        and self.map_layer_file_widget.filePath() != ""
                     )
                 )
                 or self._get_selected_default_layer() != {}
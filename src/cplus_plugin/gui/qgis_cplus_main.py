@@ -85,6 +85,7 @@ from ..models.financial import ActivityNpv
 from ..conf import settings_manager, Settings
 
 from ..lib.financials import create_npv_pwls
+from ..lib.raster import raster_band_statistics
 
 from .components.custom_tree_widget import CustomTreeWidget
 
@@ -944,7 +945,8 @@ class QgisCplusMain(QtWidgets.QDockWidget, WidgetUi):
         :param npv_pwl_path: Absolute file path of the created NPV PWL.
         :type npv_pwl_path: str
 
-        :param algorithm: Processing algorithm that created the NPV PWL.
+        :param algorithm: Processing algorithm that created the NPV PWL,
+        None if the NPV PWL was not created through processing.
         :type algorithm: QgsProcessingAlgorithm
 
         :param context: Contextual information that was used to create
@@ -2104,7 +2106,7 @@ class QgisCplusMain(QtWidgets.QDockWidget, WidgetUi):
 
             if (
                 scenario_result.output_layer_name is None
-                or scenario_result.output_layer_name is ""
+                or scenario_result.output_layer_name == ""
             ):
                 scenario_result.output_layer_name = layer_name
 
@@ -2281,11 +2283,13 @@ class QgisCplusMain(QtWidgets.QDockWidget, WidgetUi):
         # Retrieves a build-in QGIS color ramp
         color_ramp = activity.color_ramp()
 
-        stats = layer.dataProvider().bandStatistics(1)
+        # The classification only needs approximate values, the stored
+        # statistics of the analysis outputs are used when available.
+        stats = raster_band_statistics(layer.source(), approximate=True)
         renderer = QgsSingleBandPseudoColorRenderer(layer.dataProvider(), 1)
 
-        renderer.setClassificationMin(stats.minimumValue)
-        renderer.setClassificationMax(stats.maximumValue)
+        renderer.setClassificationMin(stats.minimum)
+        renderer.setClassificationMax(stats.maximum)
 
         renderer.createShader(
             color_ramp, QgsColorRampShader.Interpolated, QgsColorRampShader.Continuous
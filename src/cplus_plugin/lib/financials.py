@@ -3,27 +3,48 @@
 Contains functions for financial computations.
 """
 
+import concurrent.futures
 import datetime
-from functools import partial
-import pathlib
+from functools import lru_cache
+import math
+import os
 import typing
 
+import numpy as np
+from osgeo import gdal
+
 from qgis.core import (
+    QgsCoordinateReferenceSystem,
     QgsFeedback,
     QgsProcessingContext,
-    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingMultiStepFeedback,
 )
 
-from qgis import processing
-
 from ..definitions.constants import NPV_PRIORITY_LAYERS_SEGMENT, PRIORITY_LAYERS_SEGMENT
 from ..conf import settings_manager, Settings
 from ..models.financial import ActivityNpvCollection
 from ..utils import clean_filename, FileUtils, log, tr
 
 
+@lru_cache(maxsize=4096)
+def _discount_factor(year: int, discount: float) -> float:
+    """Calculates the multiplier for discounting a value in the given
+    year. The result is cached since the same year and discount
+    combination is used across several activities.
+
+    :param year: Relative year i.e. between 1 and 99.
+    :type year: int
+
+    :param discount: Discount value as a percent i.e. between 0 and 100.
+    :type discount: float
+
+    :returns: The factor for discounting a value in the given year.
+    :rtype: float
+    """
+    return 1.0 / ((1 + discount / 100.0) ** (year - 1))
+
+
 def compute_discount_value(
     revenue: float, cost: float, year: int, discount: float
 ) -> float:
@@ -44,7 +65,135 @@ def compute_discount_value(
     :returns: The discounted value for the given year.
     :rtype: float
     """
-    return (revenue - cost) / ((1 + discount / 100.0) ** (year - 1))
+    return (revenue - cost) * _discount_factor(year, discount)
+
+
+def compute_discount_values(
+    revenues: typing.Sequence[float],
+    costs: typing.Sequence[float],
+    discount: float,
+    years: typing.Sequence[int] = None,
+) -> typing.List[float]:
+    """Calculates the discounted values for a series of years in a
+    single vectorized pass.
+
+    :param revenues: Projected total revenues for each year.
+    :type revenues: typing.Sequence[float]
+
+    :param costs: Projected total costs for each year, should be the
+    same length as `revenues`.
+    :type costs: typing.Sequence[float]
+
+    :param discount: Discount value as a percent i.e. between 0 and 100.
+    :type discount: float
+
+    :param years: Relative year for each revenue/cost pair. If not
+    specified, consecutive years starting from 1 will be used.
+    :type years: typing.Sequence[int]
+
+    :returns: The discounted values in the same order as the input
+    revenues and costs.
+    :rtype: list
+
+    :raises ValueError: When the revenues, costs and years have
+    different lengths.
+    """
+    count = len(revenues)
+    if len(costs) != count or (years is not None and len(years) != count):
+        raise ValueError("The revenues, costs and years should have the same length.")
+
+    net_values = np.asarray(revenues, dtype=np.float64) - np.asarray(
+        costs, dtype=np.float64
+    )
+    discount_base = 1 + discount / 100.0
+
+    if years is None:
+        # For consecutive years, each discount factor is the previous
+        # year's factor multiplied by the discount base.
+        discount_factors = np.cumprod(
+            np.concatenate(([1.0], np.full(max(count - 1, 0), discount_base)))
+        )[:count]
+    else:
+        discount_factors = np.power(
+            discount_base, np.asarray(years, dtype=np.float64) - 1
+        )
+
+    return (net_values / discount_factors).tolist()
+
+
+@lru_cache(maxsize=512)
+def _npv_pwl_layer_name(base_name: str) -> str:
+    """Creates a file-safe layer name for an NPV PWL from the base name
+    of an activity NPV. The result is cached as base names are reused
+    across runs.
+
+    :param base_name: Base name of the activity NPV.
+    :type base_name: str
+
+    :returns: Lower case name with spaces and invalid filename
+    characters replaced by underscores.
+    :rtype: str
+    """
+    return clean_filename(base_name.replace(" ", "_").lower())
+
+
+def _create_constant_raster(
+    output_path: str,
+    extent: typing.Tuple[float, float, float, float],
+    crs_wkt: str,
+    pixel_size: float,
+    value: float,
+) -> bool:
+    """Creates a single band Float32 GeoTIFF whose pixels are all set
+    to the given value.
+
+    The raster dimensions are computed in the same way as the
+    'native:createconstantrasterlayer' processing algorithm but
+    the file is written directly using GDAL.
+
+    :param output_path: Absolute path of the output raster.
+    :type output_path: str
+
+    :param extent: Extent of the output raster as xmin, xmax, ymin, ymax.
+    :type extent: tuple
+
+    :param crs_wkt: WKT representation of the output CRS.
+    :type crs_wkt: str
+
+    :param pixel_size: Pixel size of the output raster.
+    :type pixel_size: float
+
+    :param value: Constant value of the raster pixels.
+    :type value: float
+
+    :returns: True if the raster was successfully created, else False.
+    :rtype: bool
+    """
+    x_min, x_max, y_min, y_max = extent
+    columns = max(math.ceil((x_max - x_min) / pixel_size), 1)
+    rows = max(math.ceil((y_max - y_min) / pixel_size), 1)
+
+    driver = gdal.GetDriverByName("GTiff")
+    dataset = driver.Create(
+        output_path,
+        columns,
+        rows,
+        1,
+        gdal.GDT_Float32,
+        ["COMPRESS=DEFLATE", "TILED=YES"],
+    )
+    if dataset is None:
+        return False
+
+    dataset.SetGeoTransform((x_min, pixel_size, 0.0, y_max, 0.0, -pixel_size))
+    dataset.SetProjection(crs_wkt)
+    dataset.GetRasterBand(1).Fill(value)
+    dataset.FlushCache()
+
+    # Closes the dataset
+    dataset = None
+
+    return True
 
 
 def create_npv_pwls(
@@ -84,7 +233,9 @@ def create_npv_pwls(
     :type target_extent: str
 
     :param on_finish_func: Function to be executed when a constant raster
-    has been created.
+    has been created. It is called with the activity NPV, the raster path,
+    None in place of a processing algorithm, the processing context and
+    the feedback object.
     :type on_finish_func: Callable
 
     :param on_removed_func: Function to be executed when a disabled NPV PWL has
@@ -100,100 +251,184 @@ def create_npv_pwls(
         log(message=tr("No base directory for saving NPV PWLs."), info=False)
         return []
 
-    # Create NPV PWL subdirectory
-    FileUtils.create_npv_pwls_dir(base_dir)
+    valid_mappings = [
+        activity_npv
+        for activity_npv in npv_collection.mappings
+        if activity_npv.activity is not None and activity_npv.params is not None
+    ]
+    if len(valid_mappings) == 0:
+        log(
+            tr(
+                "Could not create or update activity NPVs as activity and NPV parameter information is missing."
+            ),
+            info=False,
+        )
+        # Mark all steps as complete
+        multi_step_feedback.setCurrentStep(len(npv_collection.mappings))
+        return []
+
+    # Create NPV PWL subdirectory only if there are NPV PWLs to be written
+    if any(
+        activity_npv.enabled or not npv_collection.remove_existing
+        for activity_npv in valid_mappings
+    ):
+        FileUtils.create_npv_pwls_dir(base_dir)
 
     # NPV PWL root directory
-    npv_base_dir = f"{base_dir}/{PRIORITY_LAYERS_SEGMENT}/{NPV_PRIORITY_LAYERS_SEGMENT}"
+    npv_base_dir = os.path.join(
+        base_dir, PRIORITY_LAYERS_SEGMENT, NPV_PRIORITY_LAYERS_SEGMENT
+    )
+
+    # Scan the existing NPV PWL files once rather than for each activity
+    if os.path.isdir(npv_base_dir):
+        with os.scandir(npv_base_dir) as dir_entries:
+            npv_file_entries = [(entry.name, entry) for entry in dir_entries]
+    else:
+        npv_file_entries = []
+
+    # Parse the target extent and CRS once for all the NPV PWLs
+    target_bounds = tuple(float(val) for val in target_extent.split(",")[:4])
+    target_crs_wkt = QgsCoordinateReferenceSystem(target_crs_id).toWkt()
+
+    # Translated messages used in the activity loops
+    missing_info_msg_tr = tr(
+        "Could not create or update activity NPV as activity and NPV parameter information is missing."
+    )
+    deleting_tr = tr("Deleting")
+    undeletable_msg_tr = tr("Unable to delete NPV PWL")
+    undeletable_conclusion_msg_tr = tr(
+        "File will be deleted in subsequent processes if not locked"
+    )
+    creation_err_tr = tr("Error creating NPV PWL")
+
+    # Output layers are suffixed with the time this run started
+    npv_pwl_file_suffix = (
+        f"_{datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.tif"
+    )
 
     current_step = 0
     multi_step_feedback.setCurrentStep(current_step)
 
     results = []
 
+    # Activity NPVs whose NPV PWLs will be created
+    pwl_jobs = []
+
+    # Lazily populated mapping of PWL names to their identifiers
+    pwl_ids_by_name = None
+
     for i, activity_npv in enumerate(npv_collection.mappings):
         if feedback.isCanceled():
             break
 
         if activity_npv.activity is None or activity_npv.params is None:
-            log(
-                tr(
-                    "Could not create or update activity NPV as activity and NPV parameter information is missing."
-                ),
-                info=False,
-            )
+            log(missing_info_msg_tr, info=False)
 
             current_step += 1
             multi_step_feedback.setCurrentStep(current_step)
 
             continue
 
-        base_layer_name = clean_filename(
-            activity_npv.base_name.replace(" ", "_").lower()
-        )
+        base_layer_name = _npv_pwl_layer_name(activity_npv.base_name)
 
         # Delete existing NPV PWLs. Relevant layers will be re-created
         # where applicable.
-        for del_npv_path in pathlib.Path(npv_base_dir).glob(f"*{base_layer_name}*"):
+        deleted_entries = []
+        for file_name, entry in npv_file_entries:
+            if base_layer_name not in file_name:
+                continue
             try:
-                log(f"{tr('Deleting')} - NPV PWL {del_npv_path}")
-                pathlib.Path(del_npv_path).unlink()
+                log(f"{deleting_tr} - NPV PWL {entry.path}")
+                os.unlink(entry.path)
+                deleted_entries.append(file_name)
             except OSError as os_ex:
-                base_msg_tr = tr("Unable to delete NPV PWL")
-                conclusion_msg_tr = tr(
-                    "File will be deleted in subsequent processes if not locked"
-                )
                 log(
-                    f"{base_msg_tr}: {os_ex.strerror}. {conclusion_msg_tr}.", info=False
+                    f"{undeletable_msg_tr}: {os_ex.strerror}. "
+                    f"{undeletable_conclusion_msg_tr}.",
+                    info=False,
                 )
 
+        if deleted_entries:
+            npv_file_entries = [
+                (file_name, entry)
+                for file_name, entry in npv_file_entries
+                if file_name not in deleted_entries
+            ]
+
         # Delete if PWL previously existed and is now disabled
         if not activity_npv.enabled:
             if npv_collection.remove_existing:
+                # Index the PWL identifiers by name once for all the
+                # disabled activities.
+                if pwl_ids_by_name is None:
+                    pwl_ids_by_name = {
+                        pwl.get("name"): pwl.get("uuid")
+                        for pwl in settings_manager.get_priority_layers()
+                        if pwl.get("name")
+                    }
+
                 # Delete corresponding PWL entry in the settings
-                del_pwl = settings_manager.find_layer_by_name(activity_npv.base_name)
-                if del_pwl is not None:
-                    pwl_id = del_pwl.get("uuid", None)
-                    if pwl_id is not None:
-                        settings_manager.delete_priority_layer(pwl_id)
-                        if on_removed_func is not None:
-                            on_removed_func(str(del_pwl["uuid"]))
+                pwl_id = pwl_ids_by_name.pop(activity_npv.base_name, None)
+                if pwl_id is not None:
+                    settings_manager.delete_priority_layer(pwl_id)
+                    if on_removed_func is not None:
+                        on_removed_func(str(pwl_id))
 
                 current_step += 1
                 multi_step_feedback.setCurrentStep(current_step)
                 continue
 
         # Output layer name
-        npv_pwl_path = f"{npv_base_dir}/{base_layer_name}_{datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.tif"
-
-        output_post_processing_func = None
-        if on_finish_func is not None:
-            output_post_processing_func = partial(
-                on_finish_func, activity_npv, npv_pwl_path
-            )
-
-        try:
-            alg_params = {
-                "EXTENT": target_extent,
-                "TARGET_CRS": target_crs_id,
-                "PIXEL_SIZE": target_pixel_size,
-                "NUMBER": activity_npv.params.normalized_npv,
-                "OUTPUT": npv_pwl_path,
-            }
-            res = processing.run(
-                "native:createconstantrasterlayer",
-                alg_params,
-                context=context,
-                feedback=multi_step_feedback,
-                onFinish=output_post_processing_func,
-            )
-            results.append(res)
-        except QgsProcessingException as ex:
-            err_tr = tr("Error creating NPV PWL")
-            log(f"{err_tr} {npv_pwl_path}")
-
-        current_step += 1
-        multi_step_feedback.setCurrentStep(current_step)
+        npv_pwl_path = os.path.join(npv_base_dir, base_layer_name + npv_pwl_file_suffix)
+
+        pwl_jobs.append((activity_npv, npv_pwl_path))
+
+    if len(pwl_jobs) == 0:
+        return results
+
+    # Each NPV PWL is written to a separate file hence the rasters are
+    # created concurrently. The callbacks are executed in the calling thread.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(8, len(pwl_jobs))
+    ) as executor:
+        future_jobs = {
+            executor.submit(
+                _create_constant_raster,
+                npv_pwl_path,
+                target_bounds,
+                target_crs_wkt,
+                target_pixel_size,
+                activity_npv.params.normalized_npv,
+            ): (activity_npv, npv_pwl_path)
+            for activity_npv, npv_pwl_path in pwl_jobs
+        }
+
+        for future in concurrent.futures.as_completed(future_jobs):
+            if feedback.isCanceled():
+                # Rasters that haven't started being written are skipped
+                for pending_future in future_jobs:
+                    pending_future.cancel()
+                break
+
+            activity_npv, npv_pwl_path = future_jobs[future]
+            # A failed raster doesn't stop the creation of the other rasters
+            try:
+                created = future.result()
+            except Exception as ex:
+                log(f"{ex}", info=False)
+                created = False
+
+            if created:
+                results.append({"OUTPUT": npv_pwl_path})
+                if on_finish_func is not None:
+                    on_finish_func(
+                        activity_npv, npv_pwl_path, None, context, multi_step_feedback
+                    )
+            else:
+                log(f"{creation_err_tr} {npv_pwl_path}")
+
+            current_step += 1
+            multi_step_feedback.setCurrentStep(current_step)
 
     return results
 
@@ -0,0 +1,1158 @@
+# -*- coding: utf-8 -*-
+"""
+Contains functions for block-wise raster calculations on aligned layers.
+"""
+
+import math
+import os
+import typing
+from functools import lru_cache
+
+import numpy as np
+from osgeo import gdal, osr
+
+from qgis.core import QgsFeedback, QgsRasterBandStats, QgsRasterLayer, QgsRectangle
+
+from ..utils import log
+
+
+OUTPUT_NODATA_VALUE = -9999.0
+
+# Creation options of the block-wise calculations outputs.
+OUTPUT_CREATION_OPTIONS = [
+    "TILED=YES",
+    "BLOCKXSIZE=512",
+    "BLOCKYSIZE=512",
+    "COMPRESS=DEFLATE",
+    "BIGTIFF=IF_SAFER",
+]
+
+# Additional creation options of the integer outputs, the horizontal
+# differencing predictor improves the compression of the integer values.
+INTEGER_CREATION_OPTIONS = ["PREDICTOR=2"]
+
+# Minimum number of rows read at once from rasters stored in strips.
+MIN_WINDOW_ROWS = 256
+
+# Nodata value and number of levels of the quantized UInt16 outputs,
+# valid values are stored from 1 to QUANTIZED_LEVELS + 1.
+QUANTIZED_NODATA_VALUE = 0
+QUANTIZED_LEVELS = 65534
+
+# Number of pixels sampled when computing approximate band statistics.
+STATISTICS_SAMPLE_SIZE = 250000
+
+
+class RasterStatistics(typing.NamedTuple):
+    """Band statistics of a raster layer."""
+
+    minimum: float
+    maximum: float
+    mean: float
+    std_dev: float
+
+
+class RasterMetadata(typing.NamedTuple):
+    """Spatial metadata of a raster layer."""
+
+    crs_wkt: str
+    x_res: float
+    y_res: float
+    x_min: float
+    y_min: float
+    x_max: float
+    y_max: float
+
+
+def raster_metadata(path: str) -> typing.Optional[RasterMetadata]:
+    """Reads the spatial metadata of the raster in the passed path
+    without loading the raster as a map layer.
+
+    :param path: Raster path
+    :type path: str
+
+    :returns: Raster metadata or None if the raster could not be opened
+    :rtype: RasterMetadata
+    """
+    if not path:
+        return None
+
+    dataset = gdal.Open(path, gdal.GA_ReadOnly)
+    if dataset is None:
+        return None
+
+    x_min, pixel_x, _, y_max, _, pixel_y = dataset.GetGeoTransform()
+    metadata = RasterMetadata(
+        dataset.GetProjection(),
+        abs(pixel_x),
+        abs(pixel_y),
+        x_min,
+        y_max + dataset.RasterYSize * pixel_y,
+        x_min + dataset.RasterXSize * pixel_x,
+        y_max,
+    )
+    dataset = None
+
+    return metadata
+
+
+@lru_cache(maxsize=512)
+def _nodata_value(path: str, modified_time: int) -> float:
+    """Returns the first band nodata value of the raster in the passed path,
+    the modified time is only used to invalidate the cached values.
+    """
+    layer = QgsRasterLayer(path, "nodata_layer")
+    return layer.dataProvider().sourceNoDataValue(1)
+
+
+@lru_cache(maxsize=512)
+def _band_statistics(
+    path: str, modified_time: int, approximate: bool = False
+) -> RasterStatistics:
+    """Returns the first band statistics of the raster in the passed path,
+    the modified time is only used to invalidate the cached values.
+
+    The statistics stored with the raster are used when available, otherwise
+    they are computed from all the raster values or from a sample of the
+    values when approximate statistics are requested.
+    """
+    statistics = _stored_band_statistics(path)
+    if statistics is not None:
+        return statistics
+
+    layer = QgsRasterLayer(path, "statistics_layer")
+    if approximate:
+        statistics = layer.dataProvider().bandStatistics(
+            1, QgsRasterBandStats.All, QgsRectangle(), STATISTICS_SAMPLE_SIZE
+        )
+    else:
+        statistics = layer.dataProvider().bandStatistics(1)
+
+    return RasterStatistics(
+        statistics.minimumValue,
+        statistics.maximumValue,
+        statistics.mean,
+        statistics.stdDev,
+    )
+
+
+def _stored_band_statistics(path: str) -> typing.Optional[RasterStatistics]:
+    """Returns the first band statistics stored in the raster metadata or
+    its auxiliary file without scanning the raster values.
+
+    The stored statistics are of the raw band values, they are converted
+    using the band scale and offset.
+
+    :param path: Raster path
+    :type path: str
+
+    :returns: Raster band statistics or None if there are no stored statistics
+    :rtype: RasterStatistics
+    """
+    dataset = gdal.Open(path, gdal.GA_ReadOnly)
+    if dataset is None:
+        return None
+
+    band = dataset.GetRasterBand(1)
+    values = band.GetStatistics(False, False)
+    if not values or values[3] < 0:
+        return None
+
+    scale = band.GetScale() or 1.0
+    offset = band.GetOffset() or 0.0
+    minimum, maximum = sorted((values[0] * scale + offset, values[1] * scale + offset))
+
+    return RasterStatistics(
+        minimum, maximum, values[2] * scale + offset, values[3] * abs(scale)
+    )
+
+
+def _modified_time(path: str) -> int:
+    """Returns the modified time of the file in the passed path or -1 when
+    the file does not exist.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return -1
+
+
+def raster_nodata_value(path: str) -> float:
+    """Returns the first band nodata value of the raster in the passed path.
+
+    The values are cached per path until the raster file is modified.
+
+    :param path: Raster path
+    :type path: str
+
+    :returns: Nodata value, NaN if the raster has no nodata value
+    :rtype: float
+    """
+    return _nodata_value(path, _modified_time(path))
+
+
+def raster_band_statistics(path: str, approximate: bool = False) -> RasterStatistics:
+    """Returns the first band statistics of the raster in the passed path.
+
+    The statistics are cached per path until the raster file is modified.
+
+    :param path: Raster path
+    :type path: str
+
+    :param approximate: Whether the statistics can be computed from a
+    sample of the raster values when the raster has no stored statistics,
+    the exact statistics are needed when the minimum and maximum are used
+    to rescale the raster values.
+    :type approximate: bool
+
+    :returns: Raster band statistics
+    :rtype: RasterStatistics
+    """
+    return _band_statistics(path, _modified_time(path), approximate)
+
+
+def create_virtual_raster(input_path: str, output_path: str) -> bool:
+    """Creates a virtual raster in the passed output path that reads the
+    input raster values, so that the input values are available in the
+    output path without being copied.
+
+    :param input_path: Input raster path
+    :type input_path: str
+
+    :param output_path: Output virtual raster path
+    :type output_path: str
+
+    :returns: Whether the virtual raster was created
+    :rtype: bool
+    """
+    dataset = gdal.Translate(output_path, input_path, format="VRT")
+    if dataset is None:
+        log(f"Problem creating the virtual raster {output_path}")
+        return False
+    dataset = None
+
+    return True
+
+
+def _same_projection(first_wkt: str, second_wkt: str) -> bool:
+    """Checks whether the passed WKT projections define the same
+    coordinate reference system.
+
+    :param first_wkt: First projection WKT
+    :type first_wkt: str
+
+    :param second_wkt: Second projection WKT
+    :type second_wkt: str
+
+    :returns: Whether the projections are the same
+    :rtype: bool
+    """
+    if first_wkt == second_wkt:
+        return True
+
+    if not first_wkt or not second_wkt:
+        return False
+
+    first_srs = osr.SpatialReference()
+    second_srs = osr.SpatialReference()
+    if first_srs.ImportFromWkt(first_wkt) != 0:
+        return False
+    if second_srs.ImportFromWkt(second_wkt) != 0:
+        return False
+
+    return bool(first_srs.IsSame(second_srs))
+
+
+def align_raster(
+    input_path: str,
+    output_path: str,
+    crs_wkt: str,
+    bounds: typing.Tuple[float, float, float, float],
+    x_res: float,
+    y_res: float,
+) -> typing.Optional[str]:
+    """Aligns the raster in the passed path to the grid defined by the
+    passed projection, bounds and resolution using a virtual raster, the
+    input values are only resampled when the virtual raster is read.
+
+    Rasters that are already on the grid are not aligned, rasters that
+    share the grid projection, resolution and origin are cropped to the
+    bounds and the rest are warped using the nearest neighbour resampling.
+
+    :param input_path: Input raster path
+    :type input_path: str
+
+    :param output_path: Output virtual raster path
+    :type output_path: str
+
+    :param crs_wkt: Grid projection WKT
+    :type crs_wkt: str
+
+    :param bounds: Grid bounds as (x_min, y_min, x_max, y_max)
+    :type bounds: tuple
+
+    :param x_res: Grid horizontal resolution
+    :type x_res: float
+
+    :param y_res: Grid vertical resolution
+    :type y_res: float
+
+    :returns: Path of the aligned raster, which is the input path if the
+    raster is already on the grid, None if the raster could not be aligned.
+    :rtype: str
+    """
+    dataset = gdal.Open(input_path, gdal.GA_ReadOnly)
+    if dataset is None:
+        log(f"Problem opening the raster {input_path} for alignment")
+        return None
+
+    x_min, pixel_x, rotation_x, y_max, rotation_y, pixel_y = dataset.GetGeoTransform()
+    x_size, y_size = dataset.RasterXSize, dataset.RasterYSize
+    projection = dataset.GetProjection()
+    nodata_value = dataset.GetRasterBand(1).GetNoDataValue()
+    dataset = None
+
+    tolerance_x = x_res / 2.0
+    tolerance_y = y_res / 2.0
+    x_offset = (bounds[0] - x_min) / x_res
+    y_offset = (y_max - bounds[3]) / y_res
+
+    # Grids are the same when the bounds fall on the raster pixel edges
+    same_grid = (
+        rotation_x == 0
+        and rotation_y == 0
+        and pixel_y < 0
+        and abs(pixel_x - x_res) < 1e-6 * x_res
+        and abs(-pixel_y - y_res) < 1e-6 * y_res
+        and abs(x_offset - round(x_offset)) < 1e-6
+        and abs(y_offset - round(y_offset)) < 1e-6
+        and _same_projection(projection, crs_wkt)
+    )
+    within_raster = (
+        bounds[0] >= x_min - tolerance_x
+        and bounds[2] <= x_min + x_size * pixel_x + tolerance_x
+        and bounds[1] >= y_max + y_size * pixel_y - tolerance_y
+        and bounds[3] <= y_max + tolerance_y
+    )
+
+    if same_grid and within_raster:
+        columns = int(round((bounds[2] - bounds[0]) / x_res))
+        rows = int(round((bounds[3] - bounds[1]) / y_res))
+        window = (int(round(x_offset)), int(round(y_offset)), columns, rows)
+        if window == (0, 0, x_size, y_size):
+            return input_path
+
+        aligned = gdal.Translate(
+            output_path, input_path, format="VRT", srcWin=list(window)
+        )
+    else:
+        aligned = gdal.Warp(
+            output_path,
+            input_path,
+            format="VRT",
+            outputBounds=tuple(bounds),
+            xRes=x_res,
+            yRes=y_res,
+            dstSRS=crs_wkt or None,
+            resampleAlg="near",
+            srcNodata=nodata_value,
+            dstNodata=(
+                nodata_value if nodata_value is not None else OUTPUT_NODATA_VALUE
+            ),
+        )
+
+    if aligned is None:
+        log(f"Problem aligning the raster {input_path}")
+        return None
+    aligned = None
+
+    return output_path
+
+
+def opencl_enabled() -> bool:
+    """Checks whether QGIS has been built with OpenCL support and whether
+    it is available and enabled, in which case the QGIS raster calculator
+    evaluates the expressions on the OpenCL device.
+
+    :returns: Whether OpenCL is enabled in QGIS
+    :rtype: bool
+    """
+    try:
+        from qgis.core import QgsOpenClUtils
+    except ImportError:
+        return False
+
+    try:
+        return QgsOpenClUtils.enabled() and QgsOpenClUtils.available()
+    except Exception as e:
+        log(f"Problem checking the OpenCL availability, {e}")
+
+    return False
+
+
+@lru_cache(maxsize=32)
+def parse_extent(extent: str) -> typing.Optional[typing.Tuple[float, ...]]:
+    """Parses the extent string used in the processing algorithms
+    i.e. 'xmin,xmax,ymin,ymax [EPSG:XXXX]'.
+
+    :param extent: Extent string
+    :type extent: str
+
+    :returns: Tuple of xmin, xmax, ymin and ymax values or None if the
+    extent string could not be parsed.
+    :rtype: tuple
+    """
+    if not extent:
+        return None
+
+    try:
+        values = tuple(float(value) for value in str(extent).split("[")[0].split(","))
+    except ValueError:
+        return None
+
+    return values if len(values) == 4 else None
+
+
+def rasters_aligned(
+    paths: typing.List[str], extent: typing.Optional[str] = None
+) -> bool:
+    """Checks whether the rasters in the passed paths share the same grid,
+    that is the same size, geotransform and projection. If an extent is
+    passed, the grid also needs to cover the extent.
+
+    :param paths: Raster paths
+    :type paths: list
+
+    :param extent: Extent string in the 'xmin,xmax,ymin,ymax [EPSG:XXXX]' format
+    :type extent: str
+
+    :returns: Whether the rasters are aligned
+    :rtype: bool
+    """
+    grids = set()
+    for path in paths:
+        dataset = gdal.Open(path)
+        if dataset is None:
+            return False
+        grids.add(
+            (
+                dataset.RasterXSize,
+                dataset.RasterYSize,
+                tuple(dataset.GetGeoTransform()),
+                dataset.GetProjection(),
+            )
+        )
+        dataset = None
+
+    if len(grids) != 1:
+        return False
+
+    if extent is None:
+        return True
+
+    bounds = parse_extent(extent)
+    if bounds is None:
+        return False
+
+    x_size, y_size, geo_transform, _ = grids.pop()
+    x_min, pixel_x, _, y_max, _, pixel_y = geo_transform
+    x_max = x_min + x_size * pixel_x
+    y_min = y_max + y_size * pixel_y
+    tolerance_x = abs(pixel_x) / 2.0
+    tolerance_y = abs(pixel_y) / 2.0
+
+    return (
+        abs(bounds[0] - x_min) <= tolerance_x
+        and abs(bounds[1] - x_max) <= tolerance_x
+        and abs(bounds[2] - y_min) <= tolerance_y
+        and abs(bounds[3] - y_max) <= tolerance_y
+    )
+
+
+def _window_size(band: gdal.Band, x_size: int, y_size: int) -> typing.Tuple[int, int]:
+    """Returns the size of the windows used to read the raster band,
+    the windows follow the band block size while rasters stored in strips
+    are read a group of strips at a time.
+
+    :param band: Raster band
+    :type band: gdal.Band
+
+    :param x_size: Raster width
+    :type x_size: int
+
+    :param y_size: Raster height
+    :type y_size: int
+
+    :returns: Width and height of the windows
+    :rtype: tuple
+    """
+    window_x, window_y = band.GetBlockSize()
+    if window_x >= x_size and window_y < MIN_WINDOW_ROWS:
+        window_y = window_y * math.ceil(MIN_WINDOW_ROWS / window_y)
+
+    return min(window_x, x_size), min(window_y, y_size)
+
+
+def _create_output(
+    reference: gdal.Dataset,
+    output_path: str,
+    quantize_range: typing.Optional[float] = None,
+    data_type: int = gdal.GDT_Float32,
+) -> typing.Optional[gdal.Dataset]:
+    """Creates a tiled single band raster output on the reference raster grid.
+
+    :param reference: Raster whose size, geotransform and projection are used
+    :type reference: gdal.Dataset
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param quantize_range: Upper bound of the values to be stored as quantized
+    UInt16 values, defaults to None which creates a raster of the passed
+    data type.
+    :type quantize_range: float
+
+    :param data_type: GDAL data type of the non quantized output
+    :type data_type: int
+
+    :returns: The output dataset or None if it couldn't be created
+    :rtype: gdal.Dataset
+    """
+    quantize = quantize_range is not None and quantize_range > 0
+    output = gdal.GetDriverByName("GTiff").Create(
+        output_path,
+        reference.RasterXSize,
+        reference.RasterYSize,
+        1,
+        gdal.GDT_UInt16 if quantize else data_type,
+        options=OUTPUT_CREATION_OPTIONS
+        + (
+            INTEGER_CREATION_OPTIONS
+            if quantize or data_type != gdal.GDT_Float32
+            else []
+        ),
+    )
+    if output is None:
+        log(f"Problem creating the raster calculation output {output_path}")
+        return None
+
+    output.SetGeoTransform(reference.GetGeoTransform())
+    output.SetProjection(reference.GetProjection())
+    output_band = output.GetRasterBand(1)
+
+    if quantize:
+        quantize_scale = quantize_range / QUANTIZED_LEVELS
+        output_band.SetNoDataValue(QUANTIZED_NODATA_VALUE)
+        output_band.SetScale(quantize_scale)
+        output_band.SetOffset(-quantize_scale)
+    else:
+        output_band.SetNoDataValue(OUTPUT_NODATA_VALUE)
+
+    return output
+
+
+def _run_windowed(
+    input_paths: typing.List[str],
+    kernel: typing.Callable,
+    output_path: typing.Union[str, typing.List[str]],
+    feedback: QgsFeedback = None,
+    quantize_range: typing.Union[float, typing.List, None] = None,
+    data_type: int = gdal.GDT_Float32,
+) -> bool:
+    """Runs the passed kernel on the aligned input rasters one window at
+    a time and writes the kernel results into tiled rasters, so that only
+    a window of each raster is held in memory.
+
+    The statistics of the written values are accumulated while writing
+    and stored with each output, so they are available without scanning
+    the outputs again.
+
+    The windows follow the block size of the first input raster. Input
+    nodata pixels are passed to the kernel as NaN values, the output pixels
+    are nodata where the kernel results are NaN and, when writing a single
+    output, where any of the input pixels are nodata.
+
+    Several outputs can be written from the same read of the inputs by
+    passing a list of output paths, the kernel then returns a list of
+    the outputs window values.
+
+    When a quantize range is passed, the kernel results are expected to be
+    within 0 and the range and are stored as UInt16 values with the band
+    scale and offset set to restore the original values when read. The
+    band scale and offset of the inputs are likewise applied to the values
+    passed to the kernel.
+
+    :param input_paths: Aligned input rasters paths
+    :type input_paths: list
+
+    :param kernel: Callable that accepts the list of the input windows values
+    as Float32 arrays and returns the output window values.
+    :type kernel: typing.Callable
+
+    :param output_path: Output layer path or list of output layers paths
+    :type output_path: typing.Union[str, list]
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :param quantize_range: Upper bound of the kernel results to be stored
+    as quantized UInt16 values, defaults to None which stores Float32 values.
+    A list with a range for each output is expected for several outputs.
+    :type quantize_range: typing.Union[float, list]
+
+    :param data_type: GDAL data type of the non quantized outputs,
+    defaults to Float32
+    :type data_type: int
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+    datasets = [gdal.Open(path) for path in input_paths]
+    if not datasets or any(dataset is None for dataset in datasets):
+        return False
+
+    single_output = isinstance(output_path, str)
+    output_paths = [output_path] if single_output else list(output_path)
+    quantize_ranges = (
+        [quantize_range]
+        if single_output
+        else list(quantize_range or [None] * len(output_paths))
+    )
+
+    reference = datasets[0]
+    x_size, y_size = reference.RasterXSize, reference.RasterYSize
+    bands = [dataset.GetRasterBand(1) for dataset in datasets]
+    nodata_values = [band.GetNoDataValue() for band in bands]
+    # Scale and offset of the quantized inputs, None for the other inputs
+    transforms = [
+        (band.GetScale() or 1.0, band.GetOffset() or 0.0)
+        if (band.GetScale() or 1.0) != 1.0 or (band.GetOffset() or 0.0) != 0.0
+        else None
+        for band in bands
+    ]
+
+    window_x, window_y = _window_size(bands[0], x_size, y_size)
+
+    outputs = []
+    for path, value_range in zip(output_paths, quantize_ranges):
+        output = _create_output(reference, path, value_range, data_type)
+        if output is None:
+            return False
+        quantize_scale = (
+            value_range / QUANTIZED_LEVELS
+            if value_range is not None and value_range > 0
+            else None
+        )
+        outputs.append((output, output.GetRasterBand(1), value_range, quantize_scale))
+
+    # Count, sum, sum of squares, minimum and maximum of each output values
+    accumulators = [[0, 0.0, 0.0, math.inf, -math.inf] for _ in outputs]
+
+    # Read buffers are allocated once and reused for all the windows.
+    buffers = [np.empty((window_y, window_x), dtype=np.float32) for _ in bands]
+    nodata_buffer = np.empty((window_y, window_x), dtype=bool)
+    input_nodata_buffer = np.empty((window_y, window_x), dtype=bool)
+
+    total_windows = math.ceil(y_size / window_y) * math.ceil(x_size / window_x)
+    processed_windows = 0
+
+    for y_offset in range(0, y_size, window_y):
+        rows = min(window_y, y_size - y_offset)
+        for x_offset in range(0, x_size, window_x):
+            if feedback is not None and feedback.isCanceled():
+                return False
+
+            columns = min(window_x, x_size - x_offset)
+            nodata_mask = nodata_buffer[:rows, :columns]
+            nodata_mask[:] = False
+            input_nodata_mask = input_nodata_buffer[:rows, :columns]
+
+            arrays = []
+            for band, nodata_value, transform, buffer in zip(
+                bands, nodata_values, transforms, buffers
+            ):
+                array = buffer[:rows, :columns]
+                band.ReadAsArray(x_offset, y_offset, columns, rows, buf_obj=array)
+                if nodata_value is not None:
+                    np.equal(array, np.float32(nodata_value), out=input_nodata_mask)
+                    array[input_nodata_mask] = np.nan
+                if transform is not None:
+                    array *= np.float32(transform[0])
+                    array += np.float32(transform[1])
+                nodata_mask |= np.isnan(array)
+                arrays.append(array)
+
+            results = kernel(arrays)
+            if single_output:
+                results = [results]
+
+            for (
+                result,
+                (_, output_band, value_range, quantize_scale),
+                accumulator,
+            ) in zip(results, outputs, accumulators):
+                result = np.asarray(result, dtype=np.float32)
+                result_nodata = np.isnan(result)
+                if single_output:
+                    result_nodata |= nodata_mask
+
+                if quantize_scale is not None:
+                    result_nodata |= result == OUTPUT_NODATA_VALUE
+                    result[result_nodata] = 0
+                    result = (
+                        np.rint(np.clip(result, 0, value_range) / quantize_scale) + 1
+                    ).astype(np.uint16)
+                    result[result_nodata] = QUANTIZED_NODATA_VALUE
+                else:
+                    result[result_nodata] = OUTPUT_NODATA_VALUE
+
+                output_band.WriteArray(result, x_offset, y_offset)
+
+                values = result[~result_nodata]
+                if values.size > 0:
+                    values = values.astype(np.float64)
+                    accumulator[0] += values.size
+                    accumulator[1] += values.sum()
+                    accumulator[2] += np.dot(values, values)
+                    accumulator[3] = min(accumulator[3], values.min())
+                    accumulator[4] = max(accumulator[4], values.max())
+
+            processed_windows += 1
+            if feedback is not None:
+                feedback.setProgress(100.0 * processed_windows / total_windows)
+
+    for (output, output_band, _, _), accumulator in zip(outputs, accumulators):
+        count, total, squares_total, minimum, maximum = accumulator
+        if count > 0:
+            mean = total / count
+            std_dev = math.sqrt(max(squares_total / count - mean * mean, 0.0))
+            output_band.SetStatistics(
+                float(minimum), float(maximum), float(mean), float(std_dev)
+            )
+        output_band.FlushCache()
+    outputs = None
+    datasets = None
+
+    return True
+
+
+def calculate_pathway_carbon(
+    pathway_path: str,
+    carbon_paths: typing.List[str],
+    output_path: str,
+    suitability_index: float,
+    carbon_coefficient: float,
+    carbon_count: int,
+    feedback: QgsFeedback = None,
+) -> bool:
+    """Adds the mean of the carbon layers into the pathway layer by reading
+    and writing the aligned rasters block by block.
+
+    The result is computed as
+    suitability_index * pathway + carbon_coefficient * (sum(carbon) / carbon_count)
+    where a suitability index of 0 leaves the pathway values unchanged, the
+    output pixels are nodata where any of the used input pixels are nodata.
+    The carbon layers are not read when the carbon coefficient is 0.
+
+    :param pathway_path: Pathway layer path
+    :type pathway_path: str
+
+    :param carbon_paths: Carbon layers paths
+    :type carbon_paths: list
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param suitability_index: Pathway suitability index
+    :type suitability_index: float
+
+    :param carbon_coefficient: Carbon coefficient
+    :type carbon_coefficient: float
+
+    :param carbon_count: Number used to average the carbon layers
+    :type carbon_count: int
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+    pathway_factor = suitability_index if suitability_index > 0 else 1.0
+    add_carbon = carbon_coefficient > 0 and len(carbon_paths) > 0
+
+    def kernel(arrays):
+        result = pathway_factor * arrays[0]
+        if add_carbon:
+            result += carbon_coefficient * (sum(arrays[1:]) / carbon_count)
+        return result
+
+    input_paths = [pathway_path] + (list(carbon_paths) if add_carbon else [])
+
+    return _run_windowed(input_paths, kernel, output_path, feedback)
+
+
+def calculate_raster_mean(
+    input_paths: typing.List[str],
+    output_path: str,
+    count: typing.Optional[int] = None,
+    feedback: QgsFeedback = None,
+) -> bool:
+    """Calculates the average of the aligned input rasters by reading and
+    writing them block by block.
+
+    :param input_paths: Input layers paths
+    :type input_paths: list
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param count: Number used to average the layers values, defaults
+    to the number of input layers
+    :type count: int
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+    divisor = count or len(input_paths)
+
+    def kernel(arrays):
+        return sum(arrays) / np.float32(divisor)
+
+    return _run_windowed(list(input_paths), kernel, output_path, feedback)
+
+
+def calculate_weighted_sum(
+    input_paths: typing.List[str],
+    output_path: str,
+    coefficients: typing.List[float],
+    feedback: QgsFeedback = None,
+) -> bool:
+    """Calculates the sum of the aligned input rasters multiplied by their
+    coefficients by reading and writing them block by block.
+
+    :param input_paths: Input layers paths
+    :type input_paths: list
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param coefficients: Coefficients of the input layers in the same order
+    :type coefficients: list
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+    weights = [np.float32(coefficient) for coefficient in coefficients]
+
+    def kernel(arrays):
+        result = weights[0] * arrays[0]
+        for weight, array in zip(weights[1:], arrays[1:]):
+            result += weight * array
+        return result
+
+    return _run_windowed(list(input_paths), kernel, output_path, feedback)
+
+
+def normalize_raster(
+    input_path: str,
+    output_path: str,
+    min_value: float,
+    max_value: float,
+    scale: float = 1.0,
+    feedback: QgsFeedback = None,
+    quantize: bool = False,
+) -> bool:
+    """Normalizes the raster in the passed input path by reading and writing
+    it block by block.
+
+    The result is computed as scale * (value - min_value) / (max_value - min_value),
+    the output pixels are nodata where the input pixels are nodata or when
+    the minimum and maximum values are equal.
+
+    Since the normalized values are bounded, they can optionally be stored
+    as quantized UInt16 values with a band scale and offset, which reduces
+    the output size at the cost of a precision of scale / 65534.
+
+    :param input_path: Input layer path
+    :type input_path: str
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param min_value: Input layer minimum value
+    :type min_value: float
+
+    :param max_value: Input layer maximum value
+    :type max_value: float
+
+    :param scale: Factor applied to the normalized values
+    :type scale: float
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :param quantize: Whether to store the normalized values as quantized
+    UInt16 values
+    :type quantize: bool
+
+    :returns: Whether the normalization was successful
+    :rtype: bool
+    """
+    value_range = max_value - min_value
+
+    def kernel(arrays):
+        if value_range == 0:
+            return np.full(arrays[0].shape, np.nan, dtype=np.float32)
+        return (arrays[0] - np.float32(min_value)) * np.float32(scale / value_range)
+
+    return _run_windowed(
+        [input_path],
+        kernel,
+        output_path,
+        feedback,
+        quantize_range=scale if quantize and scale > 0 else None,
+    )
+
+
+def normalize_weight_raster(
+    input_path: str,
+    weight_paths: typing.List[str],
+    coefficients: typing.List[float],
+    normalized_output_path: str,
+    weighted_output_path: str,
+    min_value: float,
+    max_value: float,
+    scale: float = 1.0,
+    feedback: QgsFeedback = None,
+    quantize: bool = False,
+) -> bool:
+    """Normalizes the raster in the passed input path and weights the
+    normalized values with the weight rasters in a single block by block
+    read of the inputs.
+
+    The normalized result is computed as in normalize_raster and written into
+    the normalized output, the weighted result is computed as
+    normalized + sum(coefficient * weight) and written into the weighted output.
+    The normalized output pixels are nodata where the input pixels are nodata,
+    the weighted output pixels are nodata where any of the input pixels
+    are nodata.
+
+    :param input_path: Input layer path
+    :type input_path: str
+
+    :param weight_paths: Weight layers paths aligned with the input layer
+    :type weight_paths: list
+
+    :param coefficients: Coefficients of the weight layers
+    :type coefficients: list
+
+    :param normalized_output_path: Normalized output layer path
+    :type normalized_output_path: str
+
+    :param weighted_output_path: Weighted output layer path
+    :type weighted_output_path: str
+
+    :param min_value: Input layer minimum value
+    :type min_value: float
+
+    :param max_value: Input layer maximum value
+    :type max_value: float
+
+    :param scale: Factor applied to the normalized values
+    :type scale: float
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :param quantize: Whether to store the normalized values as quantized
+    UInt16 values
+    :type quantize: bool
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+    value_range = max_value - min_value
+    weights = [np.float32(coefficient) for coefficient in coefficients]
+
+    def kernel(arrays):
+        if value_range == 0:
+            normalized = np.full(arrays[0].shape, np.nan, dtype=np.float32)
+        else:
+            normalized = (arrays[0] - np.float32(min_value)) * np.float32(
+                scale / value_range
+            )
+        weighted = normalized.copy()
+        for coefficient, array in zip(weights, arrays[1:]):
+            weighted += coefficient * array
+        return [normalized, weighted]
+
+    return _run_windowed(
+        [input_path] + list(weight_paths),
+        kernel,
+        [normalized_output_path, weighted_output_path],
+        feedback,
+        quantize_range=[scale if quantize and scale > 0 else None, None],
+    )
+
+
+def calculate_highest_position(
+    input_paths: typing.List[str],
+    output_path: str,
+    feedback: QgsFeedback = None,
+) -> bool:
+    """Calculates the position of the raster with the highest value for each
+    pixel of the aligned input rasters by reading them block by block.
+
+    The positions start from 1 following the input rasters order, the first
+    raster is used when several rasters have the highest value. Nodata input
+    pixels are ignored and the output pixels are nodata only where all the
+    input pixels are nodata.
+
+    :param input_paths: Input layers paths
+    :type input_paths: list
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :returns: Whether the calculation was successful
+    :rtype: bool
+    """
+
+    buffers = {}
+
+    def kernel(arrays):
+        # Running maximum over the inputs instead of stacking them, the
+        # comparisons with NaN nodata pixels are false hence they are
+        # skipped without branching and ties keep the first position.
+        shape = arrays[0].shape
+        if shape not in buffers:
+            buffers[shape] = (
+                np.empty(shape, dtype=np.float32),
+                np.empty(shape, dtype=np.float32),
+                np.empty(shape, dtype=bool),
+            )
+        highest, positions, greater = buffers[shape]
+        highest.fill(-np.inf)
+        positions.fill(np.nan)
+
+        for position, array in enumerate(arrays, start=1):
+            np.greater(array, highest, out=greater)
+            np.copyto(highest, array, where=greater)
+            positions[greater] = position
+
+        return [positions]
+
+    # The output is passed as a list so that only the pixels where all
+    # the inputs are nodata are set as nodata.
+    return _run_windowed(
+        list(input_paths),
+        kernel,
+        [output_path],
+        feedback,
+        data_type=gdal.GDT_Int32,
+    )
+
+
+def mask_zero_values(path: str, feedback: QgsFeedback = None) -> bool:
+    """Sets the zero values of the Float32 raster in the passed path as nodata
+    by updating the raster in place.
+
+    The band nodata value is changed to 0, hence only the windows containing
+    pixels with the previous nodata value are rewritten while the other
+    windows are only read to update the band statistics.
+
+    :param path: Raster path
+    :type path: str
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :returns: Whether the raster was updated, rasters that aren't Float32
+    GeoTIFF rasters or that have a band scale or offset are not updated.
+    Cancelling is only possible before the raster values are rewritten,
+    hence the raster is unchanged when False is returned.
+    :rtype: bool
+    """
+    dataset = gdal.Open(path, gdal.GA_Update)
+    if dataset is None or dataset.RasterCount != 1:
+        return False
+
+    # Virtual rasters would write the values into their sources
+    if dataset.GetDriver().ShortName != "GTiff":
+        return False
+
+    band = dataset.GetRasterBand(1)
+    if (
+        band.DataType != gdal.GDT_Float32
+        or (band.GetScale() or 1.0) != 1.0
+        or (band.GetOffset() or 0.0) != 0.0
+    ):
+        return False
+
+    nodata_value = band.GetNoDataValue()
+    x_size, y_size = dataset.RasterXSize, dataset.RasterYSize
+    window_x, window_y = _window_size(band, x_size, y_size)
+
+    buffer = np.empty((window_y, window_x), dtype=np.float32)
+    count, total, squares_total = 0, 0.0, 0.0
+    minimum, maximum = math.inf, -math.inf
+
+    total_windows = math.ceil(y_size / window_y) * math.ceil(x_size / window_x)
+    processed_windows = 0
+    updated = False
+
+    for y_offset in range(0, y_size, window_y):
+        rows = min(window_y, y_size - y_offset)
+        for x_offset in range(0, x_size, window_x):
+            # Once a window is rewritten the raster is updated to the end,
+            # a cancelled update would leave values that are neither nodata
+            # with the previous nor with the new nodata value.
+            if not updated and feedback is not None and feedback.isCanceled():
+                return False
+
+            columns = min(window_x, x_size - x_offset)
+            array = buffer[:rows, :columns]
+            band.ReadAsArray(x_offset, y_offset, columns, rows, buf_obj=array)
+
+            nodata_mask = np.isnan(array)
+            if nodata_value is not None and nodata_value != 0:
+                nodata_mask |= array == np.float32(nodata_value)
+
+            if nodata_mask.any():
+                array[nodata_mask] = 0
+                band.WriteArray(array, x_offset, y_offset)
+                updated = True
+
+            values = array[array != 0].astype(np.float64)
+            if values.size > 0:
+                count += values.size
+                total += values.sum()
+                squares_total += np.dot(values, values)
+                minimum = min(minimum, values.min())
+                maximum = max(maximum, values.max())
+
+            processed_windows += 1
+            if feedback is not None:
+                feedback.setProgress(100.0 * processed_windows / total_windows)
+
+    band.SetNoDataValue(0)
+    if count > 0:
+        mean = total / count
+        std_dev = math.sqrt(max(squares_total / count - mean * mean, 0.0))
+        band.SetStatistics(float(minimum), float(maximum), float(mean), float(std_dev))
+
+    band.FlushCache()
+    band = None
+    dataset = None
+
+    return True
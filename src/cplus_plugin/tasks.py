@@ -3,22 +3,34 @@
  Plugin tasks related to the scenario analysis
 
 """
+import concurrent.futures
+import dataclasses
 import datetime
+import hashlib
+import itertools
 import json
 import math
 import os
-import uuid
+import shutil
+import threading
 import typing
+from functools import lru_cache, partial
 from pathlib import Path
 
+from osgeo import gdal
+
 from qgis import processing
 from qgis.PyQt import QtCore
 from qgis.core import (
     Qgis,
+    QgsApplication,
     QgsCoordinateReferenceSystem,
     QgsProcessing,
+    QgsProcessingAlgorithm,
     QgsProcessingContext,
+    QgsProcessingException,
     QgsProcessingFeedback,
+    QgsProcessingUtils,
     QgsRasterLayer,
     QgsRectangle,
     QgsVectorLayer,
@@ -30,6 +42,23 @@ from .conf import settings_manager, Settings
 from .definitions.defaults import (
     SCENARIO_OUTPUT_FILE_NAME,
 )
+from .lib.raster import (
+    align_raster,
+    calculate_highest_position,
+    calculate_pathway_carbon,
+    calculate_raster_mean,
+    calculate_weighted_sum,
+    create_virtual_raster,
+    mask_zero_values,
+    normalize_raster,
+    normalize_weight_raster,
+    opencl_enabled,
+    raster_band_statistics,
+    raster_metadata,
+    raster_nodata_value,
+    rasters_aligned,
+    OUTPUT_CREATION_OPTIONS,
+)
 from .models.base import ScenarioResult, SpatialExtent, Activity
 from .models.helpers import clone_activity
 from .resources import *
@@ -44,6 +73,351 @@ from .utils import (
 )
 
 
+def _collect_unique_pathways(activities) -> typing.List:
+    """Returns the pathways of the passed activities, with each pathway
+    object only included once.
+
+    :param activities: List of activities
+    :type activities: typing.List[Activity]
+
+    :returns: Unique pathways
+    :rtype: typing.List[NcsPathway]
+    """
+    pathways = {}
+    for activity in activities:
+        for pathway in activity.pathways:
+            pathways.setdefault(id(pathway), pathway)
+
+    return list(pathways.values())
+
+
+def _file_key(path) -> typing.Optional[str]:
+    """Returns a key that identifies the current version of the file in the
+    passed path, using its absolute path, modification time and size.
+
+    :param path: File path
+    :type path: str
+
+    :returns: File key, None if the file does not exist
+    :rtype: str
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+
+    return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _cache_key(*parts) -> str:
+    """Returns a hash of the passed key parts.
+
+    :returns: Cache key
+    :rtype: str
+    """
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _normalize_layers(
+    layers, output, min_value, max_value, scale=1.0, feedback=None, quantize=False
+) -> bool:
+    """Normalizes the first of the passed layers into the output path,
+    used as a block-wise raster calculation.
+
+    :param layers: Calculation layers paths
+    :type layers: list
+
+    :param output: Output layer path
+    :type output: str
+
+    :param min_value: Layer minimum value
+    :type min_value: float
+
+    :param max_value: Layer maximum value
+    :type max_value: float
+
+    :param scale: Factor applied to the normalized values
+    :type scale: float
+
+    :param feedback: Feedback for the progress and cancellation
+    :type feedback: QgsFeedback
+
+    :param quantize: Whether to store the normalized values as quantized
+    UInt16 values
+    :type quantize: bool
+
+    :returns: Whether the normalization was successful
+    :rtype: bool
+    """
+    return normalize_raster(
+        layers[0], output, min_value, max_value, scale, feedback, quantize
+    )
+
+
+def _is_identity_normalization(min_value, max_value, scale=1.0) -> bool:
+    """Checks whether normalizing a layer with the passed values leaves the
+    layer values unchanged, that is when the layer values are already
+    within 0 and 1 and the scale is 1.
+
+    :param min_value: Layer minimum value
+    :type min_value: float
+
+    :param max_value: Layer maximum value
+    :type max_value: float
+
+    :param scale: Factor applied to the normalized values
+    :type scale: float
+
+    :returns: Whether the normalization is an identity
+    :rtype: bool
+    """
+    tolerance = 1e-6
+    return (
+        abs(scale - 1.0) < tolerance
+        and abs(min_value) < tolerance
+        and abs(max_value - 1.0) < tolerance
+    )
+
+
+def _reuse_layer(input_path, output_path, temporary_output=False) -> str:
+    """Makes the input layer available as an output without rewriting its
+    values, temporary outputs use the input layer directly while saved
+    outputs are hard linked to the input layer or copied when linking
+    isn't supported. Virtual raster inputs are written into the output.
+
+    :param input_path: Input layer path
+    :type input_path: str
+
+    :param output_path: Output layer path
+    :type output_path: str
+
+    :param temporary_output: Whether the output is temporary
+    :type temporary_output: bool
+
+    :returns: The output layer path
+    :rtype: str
+    """
+    if temporary_output:
+        return input_path
+
+    # Virtual rasters reference their sources with relative paths, hence
+    # their values are written into the output instead.
+    if Path(input_path).suffix.lower() == ".vrt":
+        dataset = gdal.Translate(
+            output_path,
+            input_path,
+            format="GTiff",
+            creationOptions=OUTPUT_CREATION_OPTIONS,
+        )
+        if dataset is None:
+            raise QgsProcessingException(
+                f"Problem writing the virtual raster {input_path} values"
+            )
+        dataset = None
+        return output_path
+
+    try:
+        os.link(input_path, output_path)
+    except OSError:
+        shutil.copyfile(input_path, output_path)
+
+    return output_path
+
+
+@lru_cache(maxsize=256)
+def _output_file_name(name: str) -> str:
+    """Returns the file name used for the outputs of the layer with
+    the passed name.
+
+    :param name: Activity or pathway name
+    :type name: str
+
+    :returns: Cleaned file name
+    :rtype: str
+    """
+    return clean_filename(name.replace(" ", "_"))
+
+
+def _stable_suffix(*keys) -> str:
+    """Returns a short deterministic suffix for output file names created
+    from the passed keys, so that the same inputs and parameters always
+    produce the same output name.
+
+    :returns: Output name suffix
+    :rtype: str
+    """
+    return hashlib.blake2b(
+        "|".join(str(key) for key in keys).encode(), digest_size=4
+    ).hexdigest()
+
+
+class _DirectoryListing:
+    """Checks whether files exist using a single listing of each of their
+    parent directories instead of a file system call per file.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def exists(self, path) -> bool:
+        """Checks whether the file in the passed path exists.
+
+        :param path: File path
+        :type path: str
+
+        :returns: Whether the file exists
+        :rtype: bool
+        """
+        if not path:
+            return False
+
+        directory, name = os.path.split(os.path.abspath(path))
+        if directory not in self._entries:
+            try:
+                with os.scandir(directory) as entries:
+                    self._entries[directory] = {entry.name for entry in entries}
+            except OSError:
+                self._entries[directory] = set()
+
+        if name in self._entries[directory]:
+            return True
+
+        # Names that differ only by case are found on case-insensitive
+        # file systems
+        return os.path.exists(path)
+
+
+class _PriorityLayersIndex:
+    """Indexes a snapshot of the priority layers settings by identifier
+    and aggregates their weighting coefficients by name, so that the layers
+    are looked up without reading the settings for each of the activities
+    priority layers.
+    """
+
+    def __init__(self, priority_layers: typing.List[typing.Dict]):
+        self._by_uuid = {}
+        self._coefficients = {}
+        for priority_layer in priority_layers:
+            name = priority_layer.get("name")
+            self._by_uuid[str(priority_layer.get("uuid"))] = priority_layer
+
+            # The positive groups values are aggregated once for all
+            # the activities using the layer.
+            coefficient = self._coefficients.get(name, 0.0)
+            for group in priority_layer.get("groups", []):
+                try:
+                    value = float(group.get("value"))
+                except (TypeError, ValueError):
+                    continue
+                if value > 0:
+                    coefficient += value
+            self._coefficients[name] = coefficient
+
+    def get(self, identifier) -> typing.Optional[typing.Dict]:
+        """Gets the priority layer with the passed identifier.
+
+        :param identifier: Priority layer identifier
+        :type identifier: str
+
+        :returns: Priority layer dict or None if there is no matching layer
+        :rtype: dict
+        """
+        return self._by_uuid.get(str(identifier))
+
+    def coefficient(self, name) -> float:
+        """Gets the weighting coefficient of the priority layers with the
+        passed name, which is the sum of their groups positive values.
+
+        :param name: Priority layer name
+        :type name: str
+
+        :returns: Weighting coefficient, 0 when the layer isn't used by
+        any group
+        :rtype: float
+        """
+        return self._coefficients.get(name, 0.0)
+
+
+class _OutputCache:
+    """Maps cache keys to analysis outputs, the entries are saved into
+    a JSON index file so that they are available across scenario runs.
+
+    Access to the cache entries is guarded by a lock as the analysis jobs
+    are run concurrently.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Loads the cache entries from the index file if not yet loaded."""
+        if self._entries is not None:
+            return
+
+        self._entries = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as cache_file:
+                self._entries = json.load(cache_file)
+        except Exception as e:
+            log(f"Problem loading the outputs cache {self.path}, {e}")
+
+    def get(self, key: str) -> typing.Any:
+        """Returns the cached value for the passed key.
+
+        :param key: Cache key
+        :type key: str
+
+        :returns: Cached value, None if the key is not in the cache
+        :rtype: typing.Any
+        """
+        with self._lock:
+            self._load()
+            return self._entries.get(key)
+
+    def set(self, key: str, value: typing.Any):
+        """Adds the passed value into the cache and atomically saves the
+        cache entries into the index file.
+
+        :param key: Cache key
+        :type key: str
+
+        :param value: JSON serializable value
+        :type value: typing.Any
+        """
+        with self._lock:
+            self._load()
+            self._entries[key] = value
+
+            temporary_path = f"{self.path}.{threading.get_ident()}.tmp"
+            try:
+                FileUtils.create_new_dir(os.path.dirname(self.path))
+                with open(temporary_path, "w") as cache_file:
+                    json.dump(self._entries, cache_file)
+                os.replace(temporary_path, self.path)
+            except Exception as e:
+                log(f"Problem saving the outputs cache {self.path}, {e}")
+
+
+@dataclasses.dataclass
+class _SnapJob:
+    """Layer to be snapped in a scenario analysis and the callback for
+    assigning the snapped layer path.
+    """
+
+    input_path: str
+    reference_path: str
+    extent: str
+    directory: str
+    rescale_values: bool
+    resampling_method: int
+    nodata_value: float
+    on_snapped: typing.Callable
+
+
 class ScenarioAnalysisTask(QgsTask):
     """Prepares and runs the scenario analysis"""
 
@@ -69,6 +443,7 @@ class ScenarioAnalysisTask(QgsTask):
         self.analysis_priority_layers_groups = analysis_priority_layers_groups
         self.analysis_extent = analysis_extent
         self.analysis_extent_string = None
+        self.analysis_extent_rect = None
 
         self.analysis_weighted_activities = []
         self.scenario_result = None
@@ -83,10 +458,42 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.processing_cancelled = False
         self.feedback = QgsProcessingFeedback()
+        self.connected_feedback = None
         self.processing_context = QgsProcessingContext()
 
         self.scenario = scenario
 
+        self.output_caches = {}
+        self.output_caches_lock = threading.Lock()
+
+        # Processing algorithms used by the task, by identifier
+        self.algorithms = {}
+        self.algorithms_lock = threading.Lock()
+
+        # Paths of the weighted activities layers written by the task
+        self.weighting_outputs = set()
+
+        # Aligned virtual rasters of the input layers, by original path,
+        # and the original paths by aligned virtual raster.
+        self.aligned_layers = {}
+        self.aligned_sources = {}
+
+        # Outputs of previous runs linked into the scenario directory,
+        # by their path in the scenario directory.
+        self.linked_outputs = {}
+
+        # Counter used to give the outputs of the task unique file names
+        self.output_counter = itertools.count()
+
+    def next_output_suffix(self) -> str:
+        """Returns the next suffix used to give an output of the task
+        a unique file name within the scenario directory.
+
+        :returns: Output file name suffix
+        :rtype: str
+        """
+        return f"{next(self.output_counter):04x}"
+
     def get_settings_value(self, name: str, default=None, setting_type=None):
         """Gets value of the setting with the passed name.
 
@@ -232,13 +639,27 @@ class ScenarioAnalysisTask(QgsTask):
                     selected_pathway = pathway
                     break
 
-        target_layer = QgsRasterLayer(selected_pathway.path, selected_pathway.name)
+        # Only the pathway layer spatial metadata is needed for the extent
+        # alignment, the layer is only loaded if GDAL can't read it.
+        pathway_path = selected_pathway.path if selected_pathway else None
+        metadata = raster_metadata(pathway_path)
 
-        dest_crs = (
-            target_layer.crs()
-            if selected_pathway and selected_pathway.path
-            else QgsCoordinateReferenceSystem("EPSG:4326")
-        )
+        if metadata is not None:
+            dest_crs = QgsCoordinateReferenceSystem.fromWkt(metadata.crs_wkt)
+            raster_extent = QgsRectangle(
+                metadata.x_min, metadata.y_min, metadata.x_max, metadata.y_max
+            )
+            x_res, y_res = metadata.x_res, metadata.y_res
+        else:
+            target_layer = QgsRasterLayer(pathway_path, "target_layer")
+            dest_crs = (
+                target_layer.crs()
+                if pathway_path
+                else QgsCoordinateReferenceSystem("EPSG:4326")
+            )
+            raster_extent = target_layer.extent()
+            x_res = target_layer.rasterUnitsPerPixelX()
+            y_res = target_layer.rasterUnitsPerPixelY()
 
         processing_extent = QgsRectangle(
             float(self.analysis_extent.bbox[0]),
@@ -247,7 +668,9 @@ class ScenarioAnalysisTask(QgsTask):
             float(self.analysis_extent.bbox[3]),
         )
 
-        snapped_extent = self.align_extent(target_layer, processing_extent)
+        snapped_extent = self.align_extent(
+            raster_extent, x_res, y_res, processing_extent
+        )
 
         extent_string = (
             f"{snapped_extent.xMinimum()},{snapped_extent.xMaximum()},"
@@ -255,6 +678,11 @@ class ScenarioAnalysisTask(QgsTask):
             f" [{dest_crs.authid()}]"
         )
 
+        # The snapped extent is computed once and shared by all the
+        # analysis stages.
+        self.analysis_extent_rect = snapped_extent
+        self.analysis_extent_string = extent_string
+
         self.log_message(
             "Original area of interest extent: "
             f"{processing_extent.asWktPolygon()} \n"
@@ -269,16 +697,29 @@ class ScenarioAnalysisTask(QgsTask):
         )
         reference_layer = self.get_settings_value(Settings.SNAP_LAYER, default="")
         reference_layer_path = Path(reference_layer)
-        if (
+        snapping = (
             snapping_enabled
             and os.path.exists(reference_layer)
             and reference_layer_path.is_file()
-        ):
+        )
+        if snapping:
             self.snap_analysis_data(
                 self.analysis_activities,
                 extent_string,
             )
 
+        # Aligning the input layers to the analysis grid once, so that the
+        # analysis stages read aligned layers instead of resampling them.
+        # Snapped layers are already on the reference layer grid.
+        if metadata is not None and not snapping:
+            self.align_analysis_data(
+                self.analysis_activities,
+                snapped_extent,
+                metadata.crs_wkt,
+                x_res,
+                y_res,
+            )
+
         # Preparing all the pathways by adding them together with
         # their carbon layers before creating
         # their respective activities.
@@ -287,18 +728,45 @@ class ScenarioAnalysisTask(QgsTask):
             Settings.NCS_WITH_CARBON, default=True, setting_type=bool
         )
 
-        self.run_pathways_analysis(
-            self.analysis_activities,
+        stage_parameters = [
+            self.get_settings_value(Settings.PATHWAY_SUITABILITY_INDEX, default=0),
+            self.get_settings_value(Settings.CARBON_COEFFICIENT, default=0.0),
+            self.get_settings_value(
+                Settings.QUANTIZE_OUTPUTS, default=False, setting_type=bool
+            ),
             extent_string,
-            temporary_output=not save_output,
-        )
+        ]
+
+        # Temporary outputs are not kept across runs hence they are not cached
+        if save_output:
+            self.run_cached_pathways_stage(
+                "pathways_analysis",
+                partial(
+                    self.run_pathways_analysis,
+                    self.analysis_activities,
+                    extent_string,
+                    temporary_output=False,
+                ),
+                stage_parameters,
+            )
+        else:
+            self.run_pathways_analysis(
+                self.analysis_activities,
+                extent_string,
+                temporary_output=True,
+            )
 
         # Normalizing all the activities pathways using the carbon coefficient and
         # the pathway suitability index
 
-        self.run_pathways_normalization(
-            self.analysis_activities,
-            extent_string,
+        self.run_cached_pathways_stage(
+            "pathways_normalization",
+            partial(
+                self.run_pathways_normalization,
+                self.analysis_activities,
+                extent_string,
+            ),
+            stage_parameters,
         )
 
         # Creating activities from the normalized pathways
@@ -342,26 +810,42 @@ class ScenarioAnalysisTask(QgsTask):
         # After creating activities, we normalize them using the same coefficients
         # used in normalizing their respective pathways.
 
-        save_output = self.get_settings_value(
+        save_normalized_output = self.get_settings_value(
             Settings.LANDUSE_NORMALIZED, default=True, setting_type=bool
         )
 
-        self.run_activities_normalization(
-            self.analysis_activities,
-            extent_string,
-            temporary_output=not save_output,
-        )
-
         # Weighting the activities with their corresponding priority weighting layers
         save_output = self.get_settings_value(
             Settings.LANDUSE_WEIGHTED, default=True, setting_type=bool
         )
-        weighted_activities, result = self.run_activities_weighting(
+
+        if self.activities_weighting_fusable(
             self.analysis_activities,
             self.analysis_priority_layers_groups,
             extent_string,
-            temporary_output=not save_output,
-        )
+        ):
+            # Aligned activities are normalized and weighted in a single pass
+            # instead of writing and reading back the normalized layers.
+            weighted_activities, result = self.run_activities_normalization_weighting(
+                self.analysis_activities,
+                self.analysis_priority_layers_groups,
+                extent_string,
+                normalized_temporary_output=not save_normalized_output,
+                weighted_temporary_output=not save_output,
+            )
+        else:
+            self.run_activities_normalization(
+                self.analysis_activities,
+                extent_string,
+                temporary_output=not save_normalized_output,
+            )
+
+            weighted_activities, result = self.run_activities_weighting(
+                self.analysis_activities,
+                self.analysis_priority_layers_groups,
+                extent_string,
+                temporary_output=not save_output,
+            )
 
         self.analysis_weighted_activities = weighted_activities
         self.scenario.weighted_activities = weighted_activities
@@ -427,16 +911,274 @@ class ScenarioAnalysisTask(QgsTask):
         """
         if not self.processing_cancelled:
             self.set_custom_progress(value)
-        else:
+        elif self.feedback is not None:
+            # Cancels the running algorithm, the feedback and processing
+            # context are kept instead of being recreated.
+            self.feedback.cancel()
+
+    def get_processing_feedback(self) -> QgsProcessingFeedback:
+        """Returns the task processing feedback with its progress connected
+        to the task progress.
+
+        The same feedback is used by all the processing stages and it is
+        never replaced, after a cancellation it stays cancelled hence the
+        stages check the task processing_cancelled state before using it.
+
+        :returns: Task processing feedback
+        :rtype: QgsProcessingFeedback
+        """
+        if self.feedback is None:
             self.feedback = QgsProcessingFeedback()
-            self.processing_context = QgsProcessingContext()
 
-    def align_extent(self, raster_layer, target_extent):
+        if self.feedback is not self.connected_feedback:
+            self.feedback.progressChanged.connect(self.update_progress)
+            self.connected_feedback = self.feedback
+
+        return self.feedback
+
+    def run_concurrent_jobs(self, jobs: typing.List[typing.Callable]) -> typing.List:
+        """Runs the passed independent jobs concurrently using a bounded
+        thread pool.
+
+        Processing contexts and feedback objects are not thread-safe, hence
+        each job is called with its own processing context, which copies
+        the thread-safe settings of the task processing context, and its
+        own feedback object. The progress of all the jobs is aggregated into
+        the task progress.
+
+        :param jobs: Callables that accept a processing context and feedback
+        as arguments and return the job result.
+        :type jobs: typing.List[typing.Callable]
+
+        :returns: The results of the jobs in the same order as the passed
+        jobs. The result of a job that was skipped due to the processing
+        being cancelled will be None.
+        :rtype: list
+        """
+        results = [None] * len(jobs)
+        if len(jobs) == 0:
+            return results
+
+        jobs_progress = [0.0] * len(jobs)
+
+        def run_job(index, job):
+            if self.processing_cancelled:
+                return None
+
+            context = QgsProcessingContext()
+            context.copyThreadSafeSettings(self.processing_context)
+            feedback = QgsProcessingFeedback()
+
+            def on_progress_changed(value):
+                if self.processing_cancelled:
+                    feedback.cancel()
+                    return
+                jobs_progress[index] = value
+                self.update_progress(sum(jobs_progress) / len(jobs_progress))
+
+            feedback.progressChanged.connect(on_progress_changed)
+
+            return job(context, feedback)
+
+        errors = []
+        max_workers = max(1, min(len(jobs), os.cpu_count() or 1))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_indexes = {
+                executor.submit(run_job, index, job): index
+                for index, job in enumerate(jobs)
+            }
+            for future in concurrent.futures.as_completed(future_indexes):
+                try:
+                    results[future_indexes[future]] = future.result()
+                except Exception as e:
+                    errors.append(e)
+
+        # Errors are propagated to the caller once all the jobs have
+        # finished running.
+        if errors:
+            raise errors[0]
+
+        return results
+
+    def run_algorithm(
+        self,
+        algorithm: str,
+        parameters: dict,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> typing.Dict:
+        """Runs a processing algorithm as a job using the given context
+        and feedback.
+
+        :param algorithm: Identifier of the processing algorithm.
+        :type algorithm: str
+
+        :param parameters: Algorithm parameters.
+        :type parameters: dict
+
+        :param context: Processing context for the job.
+        :type context: QgsProcessingContext
+
+        :param feedback: Feedback for the job.
+        :type feedback: QgsProcessingFeedback
+
+        :returns: The algorithm results.
+        :rtype: dict
+        """
+        prototype = self.get_algorithm(algorithm)
+        if prototype is None:
+            return processing.run(
+                algorithm,
+                parameters,
+                context=context,
+                feedback=feedback,
+            )
+
+        # Each job runs its own instance of the algorithm
+        results, successful = prototype.create().run(parameters, context, feedback)
+        if not successful:
+            raise QgsProcessingException(
+                tr(f"There were errors executing the algorithm {algorithm}")
+            )
+
+        return results
+
+    def get_algorithm(self, algorithm: str) -> typing.Optional[QgsProcessingAlgorithm]:
+        """Gets the processing algorithm with the passed identifier, the
+        algorithms are looked up in the processing registry only once.
+
+        :param algorithm: Identifier of the processing algorithm.
+        :type algorithm: str
+
+        :returns: The registered algorithm or None if it wasn't found
+        :rtype: QgsProcessingAlgorithm
+        """
+        with self.algorithms_lock:
+            if algorithm not in self.algorithms:
+                self.algorithms[
+                    algorithm
+                ] = QgsApplication.processingRegistry().algorithmById(algorithm)
+            return self.algorithms[algorithm]
+
+    def run_raster_calculation(
+        self,
+        parameters: dict,
+        calculation: typing.Callable,
+        file_name: str,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> typing.Dict:
+        """Runs a raster calculation as a job.
+
+        When the calculation layers are aligned with the calculation extent
+        the passed block-wise calculation is used, otherwise the raster
+        calculator algorithm is used with the passed parameters.
+
+        :param parameters: Raster calculator algorithm parameters.
+        :type parameters: dict
+
+        :param calculation: Block-wise calculation that accepts the
+        input layers paths, the output path and a feedback.
+        :type calculation: typing.Callable
+
+        :param file_name: Output file name used for temporary outputs
+        :type file_name: str
+
+        :param context: Processing context for the job.
+        :type context: QgsProcessingContext
+
+        :param feedback: Feedback for the job.
+        :type feedback: QgsProcessingFeedback
+
+        :returns: The calculation results.
+        :rtype: dict
+        """
+        layers = parameters["LAYERS"]
+        if rasters_aligned(layers, parameters["EXTENT"]):
+            output = parameters["OUTPUT"]
+            if output == QgsProcessing.TEMPORARY_OUTPUT:
+                output = QgsProcessingUtils.generateTempFilename(file_name)
+
+            if calculation(layers, output, feedback=feedback):
+                return {"OUTPUT": output}
+
+            self.log_message(
+                f"Problem calculating {output} directly, "
+                f"using the raster calculator instead \n"
+            )
+
+        return self.run_algorithm(
+            "qgis:rastercalculator", parameters, context, feedback
+        )
+
+    def run_pathway_calculation(
+        self,
+        parameters: dict,
+        suitability_index: float,
+        carbon_coefficient: float,
+        carbon_count: int,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> typing.Dict:
+        """Runs the pathway and carbon layers calculation as a job.
+
+        When the pathway and carbon layers are aligned with the calculation
+        extent the calculation is done block by block directly on the rasters,
+        otherwise the raster calculator algorithm is used.
+
+        :param parameters: Raster calculator algorithm parameters.
+        :type parameters: dict
+
+        :param suitability_index: Pathway suitability index
+        :type suitability_index: float
+
+        :param carbon_coefficient: Carbon coefficient
+        :type carbon_coefficient: float
+
+        :param carbon_count: Number used to average the carbon layers
+        :type carbon_count: int
+
+        :param context: Processing context for the job.
+        :type context: QgsProcessingContext
+
+        :param feedback: Feedback for the job.
+        :type feedback: QgsProcessingFeedback
+
+        :returns: The calculation results.
+        :rtype: dict
+        """
+
+        def calculation(layers, output, feedback=None):
+            return calculate_pathway_carbon(
+                layers[0],
+                layers[1:],
+                output,
+                suitability_index,
+                carbon_coefficient,
+                carbon_count,
+                feedback,
+            )
+
+        return self.run_raster_calculation(
+            parameters,
+            calculation,
+            f'{Path(parameters["LAYERS"][0]).stem}.tif',
+            context,
+            feedback,
+        )
+
+    def align_extent(self, raster_extent, x_res, y_res, target_extent):
         """Snaps the passed extent to the activities pathway layer pixel bounds
 
-        :param raster_layer: The target layer that the passed extent will be
-        aligned with
-        :type raster_layer: QgsRasterLayer
+        :param raster_extent: Extent of the target layer that the passed
+        extent will be aligned with
+        :type raster_extent: QgsRectangle
+
+        :param x_res: Target layer pixel width
+        :type x_res: float
+
+        :param y_res: Target layer pixel height
+        :type y_res: float
 
         :param target_extent: Spatial extent that will be used a target extent when
         doing alignment.
@@ -444,25 +1186,33 @@ class ScenarioAnalysisTask(QgsTask):
         """
 
         try:
-            raster_extent = raster_layer.extent()
-
-            x_res = raster_layer.rasterUnitsPerPixelX()
-            y_res = raster_layer.rasterUnitsPerPixelY()
-
-            left = raster_extent.xMinimum() + x_res * math.floor(
-                (target_extent.xMinimum() - raster_extent.xMinimum()) / x_res
-            )
-            right = raster_extent.xMinimum() + x_res * math.ceil(
-                (target_extent.xMaximum() - raster_extent.xMinimum()) / x_res
+            # All the bounds are computed as whole pixel offsets from the
+            # layer bottom left origin, the offsets are rounded before
+            # flooring or ceiling so that floating point errors don't shift
+            # bounds that are already on the layer grid by a pixel.
+            origin_x = raster_extent.xMinimum()
+            origin_y = raster_extent.yMinimum()
+
+            def pixel_offset(value, origin, resolution):
+                return round((value - origin) / resolution, 6)
+
+            left_column = math.floor(
+                pixel_offset(target_extent.xMinimum(), origin_x, x_res)
             )
-            bottom = raster_extent.yMinimum() + y_res * math.floor(
-                (target_extent.yMinimum() - raster_extent.yMinimum()) / y_res
+            right_column = math.ceil(
+                pixel_offset(target_extent.xMaximum(), origin_x, x_res)
             )
-            top = raster_extent.yMaximum() - y_res * math.floor(
-                (raster_extent.yMaximum() - target_extent.yMaximum()) / y_res
+            bottom_row = math.floor(
+                pixel_offset(target_extent.yMinimum(), origin_y, y_res)
             )
+            top_row = math.ceil(pixel_offset(target_extent.yMaximum(), origin_y, y_res))
 
-            return QgsRectangle(left, bottom, right, top)
+            return QgsRectangle(
+                origin_x + left_column * x_res,
+                origin_y + bottom_row * y_res,
+                origin_x + right_column * x_res,
+                origin_y + top_row * y_res,
+            )
 
         except Exception as e:
             self.log_message(
@@ -475,7 +1225,9 @@ class ScenarioAnalysisTask(QgsTask):
 
         return target_extent
 
-    def replace_nodata(self, layer_path, output_path, nodata_value):
+    def replace_nodata(
+        self, layer_path, output_path, nodata_value, context=None, feedback=None
+    ):
         """Adds nodata value info into the layer available
         in the passed layer_path and save the layer in the passed output_path
         path.
@@ -492,36 +1244,35 @@ class ScenarioAnalysisTask(QgsTask):
         :param nodata_value: Nodata value to be used
         :type output_path: int
 
+        :param context: Processing context to use, defaults to the
+        task processing context
+        :type context: QgsProcessingContext
+
+        :param feedback: Processing feedback to use, defaults to the
+        task feedback
+        :type feedback: QgsProcessingFeedback
+
         :returns: Whether the task operations was successful
         :rtype: bool
 
         """
-        self.feedback = QgsProcessingFeedback()
-        self.feedback.progressChanged.connect(self.update_progress)
+        if context is None:
+            context = self.processing_context
+
+        if feedback is None:
+            feedback = self.get_processing_feedback()
 
         try:
+            # The Float32 conversion and the nodata replacement are done in a
+            # single warp, this avoids writing an intermediate raster.
+            extra = ""
+            if nodata_value is not None and math.isfinite(nodata_value):
+                extra = f"-srcnodata {nodata_value}"
+
             alg_params = {
-                "COPY_SUBDATASETS": False,
                 "DATA_TYPE": 6,  # Float32
-                "EXTRA": "",
+                "EXTRA": extra,
                 "INPUT": layer_path,
-                "NODATA": None,
-                "OPTIONS": "",
-                "TARGET_CRS": None,
-                "OUTPUT": QgsProcessing.TEMPORARY_OUTPUT,
-            }
-            translate_output = processing.run(
-                "gdal:translate",
-                alg_params,
-                context=self.processing_context,
-                feedback=self.feedback,
-                is_child_algorithm=True,
-            )
-
-            alg_params = {
-                "DATA_TYPE": 0,  # Use Input Layer Data Type
-                "EXTRA": "",
-                "INPUT": translate_output["OUTPUT"],
                 "MULTITHREADING": False,
                 "NODATA": -9999,
                 "OPTIONS": "",
@@ -536,8 +1287,8 @@ class ScenarioAnalysisTask(QgsTask):
             outputs = processing.run(
                 "gdal:warpreproject",
                 alg_params,
-                context=self.processing_context,
-                feedback=self.feedback,
+                context=context,
+                feedback=feedback,
                 is_child_algorithm=True,
             )
 
@@ -574,14 +1325,11 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Adding activity pathways with carbon layers"))
 
-        pathways = []
         activities_paths = []
 
         try:
             for activity in activities:
-                if not activity.pathways and (
-                    activity.path is None or activity.path == ""
-                ):
+                if not activity.pathways and not activity.path:
                     self.set_info_message(
                         tr(
                             f"No defined activity pathways or an"
@@ -595,13 +1343,11 @@ class ScenarioAnalysisTask(QgsTask):
                     )
                     return False
 
-                for pathway in activity.pathways:
-                    if not (pathway in pathways):
-                        pathways.append(pathway)
-
-                if activity.path is not None and activity.path != "":
+                if activity.path:
                     activities_paths.append(activity.path)
 
+            pathways = _collect_unique_pathways(activities)
+
             if not pathways and len(activities_paths) > 0:
                 self.run_pathways_normalization(activities, extent)
                 return
@@ -614,13 +1360,52 @@ class ScenarioAnalysisTask(QgsTask):
                 self.get_settings_value(Settings.CARBON_COEFFICIENT, default=0.0)
             )
 
+            if (
+                carbon_coefficient <= 0
+                and suitability_index <= 0
+                and any(len(pathway.carbon_paths) > 0 for pathway in pathways)
+            ):
+                self.run_pathways_normalization(activities, extent)
+                return
+
+            pathways_carbon_paths = {}
+            carbon_sets = {}
+            directory_listing = _DirectoryListing()
+            for pathway in pathways:
+                carbon_paths = [
+                    carbon_path
+                    for carbon_path in pathway.carbon_paths
+                    if directory_listing.exists(carbon_path)
+                ]
+                carbon_set = (tuple(carbon_paths), len(pathway.carbon_paths))
+                pathways_carbon_paths[id(pathway)] = carbon_set
+                carbon_sets[carbon_set] = carbon_sets.get(carbon_set, 0) + 1
+
+            # Carbon layers averages shared by more than one pathway
+            # are calculated once and reused by the pathways.
+            carbon_means = {}
+            if carbon_coefficient > 0:
+                carbon_means = self.create_carbon_means(
+                    [
+                        carbon_set
+                        for carbon_set, pathways_count in carbon_sets.items()
+                        if pathways_count > 1 and len(carbon_set[0]) > 1
+                    ],
+                    extent,
+                    temporary_output,
+                )
+
+            jobs = []
+            jobs_pathways = []
+            queued_outputs = {}
+
             for pathway in pathways:
                 basenames = []
                 layers = []
                 path_basename = Path(pathway.path).stem
                 layers.append(pathway.path)
 
-                file_name = clean_filename(pathway.name.replace(" ", "_"))
+                file_name = _output_file_name(pathway.name)
 
                 if suitability_index > 0:
                     basenames.append(f'{suitability_index} * "{path_basename}@1"')
@@ -638,16 +1423,36 @@ class ScenarioAnalysisTask(QgsTask):
 
                 FileUtils.create_new_dir(new_carbon_directory)
 
+                carbon_set = pathways_carbon_paths[id(pathway)]
+
+                output_suffix = _stable_suffix(
+                    _file_key(pathway.path) or pathway.path,
+                    *[_file_key(path) or path for path in sorted(carbon_set[0])],
+                    carbon_set[1],
+                    carbon_coefficient,
+                    suitability_index,
+                    extent,
+                )
                 output_file = os.path.join(
-                    new_carbon_directory, f"{file_name}_{str(uuid.uuid4())[:4]}.tif"
+                    new_carbon_directory, f"{file_name}_{output_suffix}.tif"
                 )
 
-                for carbon_path in pathway.carbon_paths:
-                    carbon_full_path = Path(carbon_path)
-                    if not carbon_full_path.exists():
+                if not temporary_output:
+                    # Pathways with the same inputs share the same output
+                    if output_file in queued_outputs:
+                        jobs_pathways[queued_outputs[output_file]].append(pathway)
                         continue
+
+                carbon_count = len(pathway.carbon_paths)
+                if carbon_set in carbon_means:
+                    carbon_paths = [carbon_means[carbon_set]]
+                    carbon_count = 1
+                else:
+                    carbon_paths = carbon_set[0]
+
+                for carbon_path in carbon_paths:
                     layers.append(carbon_path)
-                    carbon_names.append(f'"{carbon_full_path.stem}@1"')
+                    carbon_names.append(f'"{Path(carbon_path).stem}@1"')
 
                 if len(carbon_names) == 1 and carbon_coefficient > 0:
                     basenames.append(f"{carbon_coefficient} * ({carbon_names[0]})")
@@ -658,14 +1463,10 @@ class ScenarioAnalysisTask(QgsTask):
                     basenames.append(
                         f"{carbon_coefficient} * ("
                         f'({" + ".join(carbon_names)}) / '
-                        f"{len(pathway.carbon_paths)})"
+                        f"{carbon_count})"
                     )
                 expression = " + ".join(basenames)
 
-                if carbon_coefficient <= 0 and suitability_index <= 0:
-                    self.run_pathways_normalization(activities, extent)
-                    return
-
                 output = (
                     QgsProcessing.TEMPORARY_OUTPUT if temporary_output else output_file
                 )
@@ -685,27 +1486,101 @@ class ScenarioAnalysisTask(QgsTask):
                     f" and carbon layers generation: {alg_params} \n"
                 )
 
-                self.feedback = QgsProcessingFeedback()
-
-                self.feedback.progressChanged.connect(self.update_progress)
+                jobs.append(
+                    partial(
+                        self.run_pathway_calculation,
+                        alg_params,
+                        suitability_index,
+                        carbon_coefficient,
+                        carbon_count,
+                    )
+                )
+                queued_outputs[output_file] = len(jobs_pathways)
+                jobs_pathways.append([pathway])
 
-                if self.processing_cancelled:
-                    return False
+            if self.processing_cancelled:
+                return False
 
-                results = processing.run(
-                    "qgis:rastercalculator",
-                    alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
-                )
+            # The pathways are independent of each other hence their
+            # calculations are run concurrently.
+            results = self.run_concurrent_jobs(jobs)
 
-                pathway.path = results["OUTPUT"]
+            for job_pathways, result in zip(jobs_pathways, results):
+                if result is None:
+                    continue
+                for pathway in job_pathways:
+                    pathway.path = result["OUTPUT"]
         except Exception as e:
             self.log_message(f"Problem running pathway analysis,  {e}")
             self.cancel_task(e)
 
         return True
 
+    def create_carbon_means(self, carbon_sets, extent, temporary_output=False):
+        """Creates the average layers of the passed carbon layers sets.
+
+        :param carbon_sets: List of carbon sets, each set is a tuple of the
+        carbon layers paths and the number of layers used for the average.
+        :type carbon_sets: list
+
+        :param extent: The selected extent from user
+        :type extent: str
+
+        :param temporary_output: Whether to save the averages as temporary
+        files
+        :type temporary_output: bool
+
+        :returns: Carbon sets mapped to their average layer path
+        :rtype: dict
+        """
+        if not carbon_sets:
+            return {}
+
+        carbon_directory = os.path.join(
+            self.scenario_directory, "pathways_carbon_layers"
+        )
+        FileUtils.create_new_dir(carbon_directory)
+
+        jobs = []
+        for carbon_paths, carbon_count in carbon_sets:
+            file_name = f"carbon_mean_{_cache_key(carbon_count, *carbon_paths)[:8]}.tif"
+            output = (
+                QgsProcessing.TEMPORARY_OUTPUT
+                if temporary_output
+                else os.path.join(carbon_directory, file_name)
+            )
+            carbon_names = [f'"{Path(path).stem}@1"' for path in carbon_paths]
+
+            alg_params = {
+                "CELLSIZE": 0,
+                "CRS": None,
+                "EXPRESSION": f'({" + ".join(carbon_names)}) / {carbon_count}',
+                "EXTENT": extent,
+                "LAYERS": list(carbon_paths),
+                "OUTPUT": output,
+            }
+
+            self.log_message(
+                f"Used parameters for the carbon layers average: {alg_params} \n"
+            )
+
+            jobs.append(
+                partial(
+                    self.run_raster_calculation,
+                    alg_params,
+                    partial(calculate_raster_mean, count=carbon_count),
+                    file_name,
+                )
+            )
+
+        results = self.run_concurrent_jobs(jobs)
+
+        return {
+            carbon_set: result["OUTPUT"]
+            for carbon_set, result in zip(carbon_sets, results)
+            if result is not None
+        }
+
     def snap_analysis_data(self, activities, extent):
         """Snaps the passed activities pathways, carbon layers and priority layers
          to align with the reference layer set on the settings
@@ -728,13 +1603,9 @@ class ScenarioAnalysisTask(QgsTask):
             )
         )
 
-        pathways = []
-
         try:
             for activity in activities:
-                if not activity.pathways and (
-                    activity.path is None or activity.path == ""
-                ):
+                if not activity.pathways and not activity.path:
                     self.set_info_message(
                         tr(
                             f"No defined activity pathways or a"
@@ -748,9 +1619,7 @@ class ScenarioAnalysisTask(QgsTask):
                     )
                     return False
 
-                for pathway in activity.pathways:
-                    if not (pathway in pathways):
-                        pathways.append(pathway)
+            pathways = _collect_unique_pathways(activities)
 
             reference_layer_path = self.get_settings_value(Settings.SNAP_LAYER)
             rescale_values = self.get_settings_value(
@@ -761,6 +1630,30 @@ class ScenarioAnalysisTask(QgsTask):
                 Settings.RESAMPLING_METHOD, default=0
             )
 
+            snap_jobs = []
+            directory_listing = _DirectoryListing()
+
+            def snap_job(input_path, directory, nodata_value, on_snapped):
+                return _SnapJob(
+                    input_path=input_path,
+                    reference_path=reference_layer_path,
+                    extent=extent,
+                    directory=directory,
+                    rescale_values=rescale_values,
+                    resampling_method=resampling_method,
+                    nodata_value=nodata_value,
+                    on_snapped=on_snapped,
+                )
+
+            def set_list_item(items, index, value):
+                items[index] = value
+
+            def set_pathway_path(pathway, path):
+                pathway.path = path
+
+            def set_priority_layer_path(priority_layer, path):
+                priority_layer["path"] = path
+
             if pathways is not None and len(pathways) > 0:
                 snapped_pathways_directory = os.path.join(
                     self.scenario_directory, "pathways"
@@ -769,8 +1662,7 @@ class ScenarioAnalysisTask(QgsTask):
                 FileUtils.create_new_dir(snapped_pathways_directory)
 
                 for pathway in pathways:
-                    pathway_layer = QgsRasterLayer(pathway.path, pathway.name)
-                    nodata_value = pathway_layer.dataProvider().sourceNoDataValue(1)
+                    nodata_value = raster_nodata_value(pathway.path)
 
                     if self.processing_cancelled:
                         return False
@@ -791,48 +1683,36 @@ class ScenarioAnalysisTask(QgsTask):
 
                         FileUtils.create_new_dir(snapped_carbon_directory)
 
-                        snapped_carbon_paths = []
+                        # Original carbon paths are retained for the layers
+                        # that cannot be snapped.
+                        snapped_carbon_paths = list(pathway.carbon_paths)
 
-                        for carbon_path in pathway.carbon_paths:
-                            carbon_layer = QgsRasterLayer(
-                                carbon_path, f"{str(uuid.uuid4())[:4]}"
-                            )
-                            nodata_value_carbon = (
-                                carbon_layer.dataProvider().sourceNoDataValue(1)
-                            )
+                        for index, carbon_path in enumerate(pathway.carbon_paths):
+                            nodata_value_carbon = raster_nodata_value(carbon_path)
 
-                            carbon_output_path = self.snap_layer(
-                                carbon_path,
-                                reference_layer_path,
-                                extent,
-                                snapped_carbon_directory,
-                                rescale_values,
-                                resampling_method,
-                                nodata_value_carbon,
+                            snap_jobs.append(
+                                snap_job(
+                                    carbon_path,
+                                    snapped_carbon_directory,
+                                    nodata_value_carbon,
+                                    partial(set_list_item, snapped_carbon_paths, index),
+                                )
                             )
 
-                            if carbon_output_path:
-                                snapped_carbon_paths.append(carbon_output_path)
-                            else:
-                                snapped_carbon_paths.append(carbon_path)
-
                         pathway.carbon_paths = snapped_carbon_paths
 
                     self.log_message(f"Snapping {pathway.name} pathway layer \n")
 
                     # Pathway snapping
 
-                    output_path = self.snap_layer(
-                        pathway.path,
-                        reference_layer_path,
-                        extent,
-                        snapped_pathways_directory,
-                        rescale_values,
-                        resampling_method,
-                        nodata_value,
+                    snap_jobs.append(
+                        snap_job(
+                            pathway.path,
+                            snapped_pathways_directory,
+                            nodata_value,
+                            partial(set_pathway_path, pathway),
+                        )
                     )
-                    if output_path:
-                        pathway.path = output_path
 
             for activity in activities:
                 self.log_message(
@@ -863,34 +1743,60 @@ class ScenarioAnalysisTask(QgsTask):
 
                         priority_layer_path = priority_layer_settings.get("path")
 
-                        if not Path(priority_layer_path).exists():
+                        if not directory_listing.exists(priority_layer_path):
                             priority_layers.append(priority_layer)
                             continue
 
-                        layer = QgsRasterLayer(
-                            priority_layer_path, f"{str(uuid.uuid4())[:4]}"
-                        )
-                        nodata_value_priority = layer.dataProvider().sourceNoDataValue(
-                            1
-                        )
+                        nodata_value_priority = raster_nodata_value(priority_layer_path)
 
-                        priority_output_path = self.snap_layer(
-                            priority_layer_path,
-                            reference_layer_path,
-                            extent,
-                            snapped_priority_directory,
-                            rescale_values,
-                            resampling_method,
-                            nodata_value_priority,
+                        snap_jobs.append(
+                            snap_job(
+                                priority_layer_path,
+                                snapped_priority_directory,
+                                nodata_value_priority,
+                                partial(set_priority_layer_path, priority_layer),
+                            )
                         )
 
-                        if priority_output_path:
-                            priority_layer["path"] = priority_output_path
-
                         priority_layers.append(priority_layer)
 
                     activity.priority_layers = priority_layers
 
+            if self.processing_cancelled:
+                return False
+
+            # All the layers are snapped concurrently, the snapped paths are
+            # then assigned back in this thread since they update the shared
+            # pathways and priority layers.
+            # Layers shared by several pathways or activities are only
+            # snapped once.
+            unique_jobs = {}
+            for job in snap_jobs:
+                job_key = (job.input_path, job.directory, str(job.nodata_value))
+                unique_jobs.setdefault(job_key, []).append(job)
+
+            results = self.run_concurrent_jobs(
+                [
+                    partial(
+                        self.snap_layer,
+                        job.input_path,
+                        job.reference_path,
+                        job.extent,
+                        job.directory,
+                        job.rescale_values,
+                        job.resampling_method,
+                        job.nodata_value,
+                    )
+                    for job, *_ in unique_jobs.values()
+                ]
+            )
+
+            for jobs, output_path in zip(unique_jobs.values(), results):
+                if not output_path:
+                    continue
+                for job in jobs:
+                    job.on_snapped(output_path)
+
         except Exception as e:
             self.log_message(f"Problem snapping layers, {e} \n")
             self.cancel_task(e)
@@ -907,6 +1813,8 @@ class ScenarioAnalysisTask(QgsTask):
         rescale_values,
         resampling_method,
         nodata_value,
+        context=None,
+        feedback=None,
     ):
         """Snaps the passed input layer using the reference layer and updates
         the snap output no data value to be the same as the original input layer
@@ -934,7 +1842,39 @@ class ScenarioAnalysisTask(QgsTask):
         :param nodata_value: Original no data value of the input layer
         :type nodata_value: float
 
+        :param context: Processing context to use, defaults to the
+        task processing context
+        :type context: QgsProcessingContext
+
+        :param feedback: Processing feedback to use, defaults to the
+        task feedback
+        :type feedback: QgsProcessingFeedback
+
+        :returns: Path of the snapped layer or None if the snapping failed
+        :rtype: str
+
         """
+        cache_key = self.snap_cache_key(
+            input_path,
+            reference_path,
+            extent,
+            rescale_values,
+            resampling_method,
+            nodata_value,
+        )
+        cached_path = self.get_cached_snap_layer(cache_key)
+        if cached_path is not None:
+            self.log_message(f"Using cached snapped layer {cached_path} \n")
+            # The cached layer is linked into the scenario directory so that
+            # the scenario doesn't depend on the previous scenario files.
+            try:
+                return self.link_cached_output(cached_path, input_path)
+            except OSError as e:
+                self.log_message(
+                    f"Problem linking the cached snapped layer {cached_path}, {e} \n"
+                )
+
+        output_path = None
 
         input_result_path, reference_result_path = align_rasters(
             input_path,
@@ -953,10 +1893,366 @@ class ScenarioAnalysisTask(QgsTask):
 
             output_path = os.path.join(directory, f"{name}_final.tif")
 
-            self.replace_nodata(input_result_path, output_path, nodata_value)
+            if self.update_nodata_in_place(input_result_path):
+                os.replace(input_result_path, output_path)
+            else:
+                self.replace_nodata(
+                    input_result_path, output_path, nodata_value, context, feedback
+                )
+
+            if os.path.exists(output_path):
+                self.add_cached_snap_layer(cache_key, output_path)
 
         return output_path
 
+    def align_analysis_data(self, activities, extent, crs_wkt, x_res, y_res):
+        """Aligns the pathways, carbon and priority weighting layers to the
+        analysis grid once for all the analysis stages.
+
+        The aligned layers are virtual rasters that are kept under the base
+        directory, their names depend on the source layer files and the grid
+        so they are reused by later runs. Layers that are already on the grid
+        are used as they are.
+
+        :param activities: List of the selected activities
+        :type activities: typing.List[Activity]
+
+        :param extent: Analysis extent aligned to the pathways grid
+        :type extent: QgsRectangle
+
+        :param crs_wkt: Analysis grid projection WKT
+        :type crs_wkt: str
+
+        :param x_res: Analysis grid horizontal resolution
+        :type x_res: float
+
+        :param y_res: Analysis grid vertical resolution
+        :type y_res: float
+        """
+        bounds = (
+            extent.xMinimum(),
+            extent.yMinimum(),
+            extent.xMaximum(),
+            extent.yMaximum(),
+        )
+        base_dir = self.get_settings_value(Settings.BASE_DIR)
+        aligned_directory = os.path.join(f"{base_dir}", ".aligned_layers")
+
+        def aligned_path(layer_path):
+            if layer_path in self.aligned_layers:
+                return self.aligned_layers[layer_path]
+
+            file_key = _file_key(layer_path)
+            if file_key is None:
+                return layer_path
+
+            output_path = os.path.join(
+                aligned_directory,
+                f"{Path(layer_path).stem}_"
+                f"{_stable_suffix(file_key, crs_wkt, bounds, x_res, y_res)}.vrt",
+            )
+
+            # Existing virtual rasters are not rewritten so that the cached
+            # outputs of the stages reading them stay valid.
+            if os.path.exists(output_path):
+                result = output_path
+            else:
+                FileUtils.create_new_dir(aligned_directory)
+                result = align_raster(
+                    layer_path, output_path, crs_wkt, bounds, x_res, y_res
+                )
+
+            self.aligned_layers[layer_path] = result or layer_path
+            if result and result != layer_path:
+                self.aligned_sources[result] = layer_path
+            return self.aligned_layers[layer_path]
+
+        try:
+            for pathway in _collect_unique_pathways(activities):
+                if self.processing_cancelled:
+                    return False
+
+                if pathway.path:
+                    pathway.path = aligned_path(pathway.path)
+                if pathway.carbon_paths:
+                    pathway.carbon_paths = [
+                        aligned_path(carbon_path)
+                        for carbon_path in pathway.carbon_paths
+                    ]
+
+            priority_layers_index = _PriorityLayersIndex(self.get_priority_layers())
+            for activity in activities:
+                settings_activity = self.get_activity(str(activity.uuid))
+                if settings_activity is None:
+                    continue
+
+                for layer in settings_activity.priority_layers:
+                    if layer is None:
+                        continue
+                    settings_layer = priority_layers_index.get(layer.get("uuid"))
+                    if settings_layer is None or not settings_layer.get("path"):
+                        continue
+                    aligned_path(settings_layer.get("path"))
+
+        except Exception as e:
+            self.log_message(f"Problem aligning the analysis layers, {e} \n")
+            self.cancel_task(e)
+            return False
+
+        return True
+
+    def get_output_cache(self, name) -> "_OutputCache":
+        """Returns the analysis outputs cache with the passed name, the cache
+        index is stored under the base directory so that the outputs can be
+        reused across scenario runs.
+
+        :param name: Cache name
+        :type name: str
+
+        :returns: Outputs cache
+        :rtype: _OutputCache
+        """
+        with self.output_caches_lock:
+            if name not in self.output_caches:
+                base_dir = self.get_settings_value(Settings.BASE_DIR)
+                self.output_caches[name] = _OutputCache(
+                    os.path.join(f"{base_dir}", f".{name}_cache", "index.json")
+                )
+
+            return self.output_caches[name]
+
+    def snap_cache_path(self):
+        """Returns the path of the snapped layers cache index file.
+
+        :returns: Snapped layers cache index path
+        :rtype: str
+        """
+        return self.get_output_cache("snap").path
+
+    def snap_cache_key(
+        self,
+        input_path,
+        reference_path,
+        extent,
+        rescale_values,
+        resampling_method,
+        nodata_value,
+    ):
+        """Creates the snapped layers cache key for the passed snapping inputs.
+
+        The key changes when any of the input or reference layer files are
+        modified.
+
+        :param input_path: Input layer source
+        :type input_path: str
+
+        :param reference_path: Reference layer source
+        :type reference_path: str
+
+        :param extent: Clip extent
+        :type extent: list
+
+        :param rescale_values: Whether to rescale pixel values
+        :type rescale_values: bool
+
+        :param resampling_method: Method to use when resampling
+        :type resampling_method: QgsAlignRaster.ResampleAlg
+
+        :param nodata_value: Original no data value of the input layer
+        :type nodata_value: float
+
+        :returns: Cache key, None if any of the layer files does not exist
+        :rtype: str
+        """
+        file_keys = [_file_key(input_path), _file_key(reference_path)]
+        if None in file_keys:
+            return None
+
+        return _cache_key(
+            *file_keys,
+            extent,
+            bool(rescale_values),
+            resampling_method,
+            nodata_value,
+        )
+
+    def get_cached_snap_layer(self, cache_key):
+        """Returns the cached snapped layer path for the passed cache key.
+
+        :param cache_key: Snapped layer cache key
+        :type cache_key: str
+
+        :returns: Path of the cached snapped layer, None if the layer
+        is not cached or the cached file no longer exists.
+        :rtype: str
+        """
+        if cache_key is None:
+            return None
+
+        cached_path = self.get_output_cache("snap").get(cache_key)
+
+        if cached_path is not None and os.path.exists(cached_path):
+            return cached_path
+
+        return None
+
+    def add_cached_snap_layer(self, cache_key, layer_path):
+        """Adds the snapped layer path into the cache and saves the cache
+        index into the disk.
+
+        :param cache_key: Snapped layer cache key
+        :type cache_key: str
+
+        :param layer_path: Snapped layer path
+        :type layer_path: str
+        """
+        if cache_key is None:
+            return
+
+        self.get_output_cache("snap").set(cache_key, layer_path)
+
+    def run_cached_pathways_stage(self, name, stage, parameters):
+        """Runs the passed pathways analysis stage, when a previous run of
+        the stage used the same pathway layers, carbon layers and parameters
+        its outputs are linked into the scenario directory instead.
+
+        The stage key includes the pathway layers files stats, so when an
+        upstream stage reuses its outputs the downstream stages are also
+        able to reuse theirs.
+
+        :param name: Stage name
+        :type name: str
+
+        :param stage: Callable that runs the stage and updates the pathways
+        layer paths.
+        :type stage: typing.Callable
+
+        :param parameters: Parameters that affect the stage outputs
+        :type parameters: list
+
+        :returns: The stage result
+        :rtype: bool
+        """
+        pathways = _collect_unique_pathways(self.analysis_activities)
+
+        # Stages without pathways continue into the activities stages
+        # hence they are not cached.
+        if not pathways:
+            return stage()
+
+        # Outputs linked from a previous run are keyed as their originals
+        def file_key(path):
+            return _file_key(self.linked_outputs.get(path, path))
+
+        file_keys = []
+        for pathway in pathways:
+            file_keys.append(file_key(pathway.path))
+            file_keys.extend(file_key(path) for path in pathway.carbon_paths)
+
+        cache = self.get_output_cache("stage")
+        cache_key = _cache_key(name, *file_keys, *parameters)
+        cached_paths = cache.get(cache_key)
+
+        if (
+            cached_paths is not None
+            and len(cached_paths) == len(pathways)
+            and all(os.path.exists(path) for path in cached_paths)
+        ):
+            self.log_message(f"Reusing the {name} stage outputs from a previous run")
+            for pathway, path in zip(pathways, cached_paths):
+                pathway.path = self.link_cached_output(path, pathway.path)
+            return True
+
+        result = stage()
+
+        if not self.processing_cancelled and result is not False:
+            cache.set(
+                cache_key,
+                [
+                    self.linked_outputs.get(pathway.path, pathway.path)
+                    for pathway in pathways
+                ],
+            )
+
+        return result
+
+    def link_cached_output(self, cached_path, input_path) -> str:
+        """Makes the passed output of a previous run available in the
+        scenario directory, the output is linked into the same named
+        sub directory of the scenario directory.
+
+        :param cached_path: Output path of the previous run
+        :type cached_path: str
+
+        :param input_path: Stage input layer path, outputs that are the
+        input layer itself are not linked.
+        :type input_path: str
+
+        :returns: Path of the output in the scenario directory
+        :rtype: str
+        """
+        if cached_path == input_path:
+            return cached_path
+
+        cached = Path(cached_path)
+        output_directory = os.path.join(self.scenario_directory, cached.parent.name)
+        output_path = os.path.join(output_directory, cached.name)
+
+        if not os.path.exists(output_path):
+            FileUtils.create_new_dir(output_directory)
+            _reuse_layer(cached_path, output_path)
+
+        self.linked_outputs[output_path] = cached_path
+
+        return output_path
+
+    def update_nodata_in_place(self, layer_path, nodata_value=-9999):
+        """Sets the nodata value of the layer in the passed path by only
+        updating its metadata.
+
+        The update is only done when the layer pixels don't need to be
+        rewritten, that is when the layer is already of Float32 data type and
+        its bands have either no nodata value or the passed nodata value.
+
+        :param layer_path: Layer path
+        :type layer_path: str
+
+        :param nodata_value: Nodata value to be set
+        :type nodata_value: float
+
+        :returns: Whether the layer nodata value was updated
+        :rtype: bool
+
+        """
+        try:
+            dataset = gdal.Open(layer_path, gdal.GA_Update)
+            if dataset is None:
+                return False
+
+            bands = [
+                dataset.GetRasterBand(index)
+                for index in range(1, dataset.RasterCount + 1)
+            ]
+            for band in bands:
+                band_nodata = band.GetNoDataValue()
+                if band.DataType != gdal.GDT_Float32 or (
+                    band_nodata is not None and band_nodata != nodata_value
+                ):
+                    return False
+
+            for band in bands:
+                band.SetNoDataValue(nodata_value)
+
+            dataset.FlushCache()
+            bands = None
+            dataset = None
+
+            return True
+        except Exception as e:
+            log(f"Problem updating the nodata value of {layer_path}, {e}")
+
+        return False
+
     def run_pathways_normalization(self, activities, extent, temporary_output=False):
         """Runs the normalization on the activities pathways layers,
         adjusting band values measured on different scale, the resulting scale
@@ -988,14 +2284,11 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Normalization of pathways"))
 
-        pathways = []
         activities_paths = []
 
         try:
             for activity in activities:
-                if not activity.pathways and (
-                    activity.path is None or activity.path == ""
-                ):
+                if not activity.pathways and not activity.path:
                     self.set_info_message(
                         tr(
                             f"No defined activity pathways or an"
@@ -1010,13 +2303,11 @@ class ScenarioAnalysisTask(QgsTask):
 
                     return False
 
-                for pathway in activity.pathways:
-                    if not (pathway in pathways):
-                        pathways.append(pathway)
-
-                if activity.path is not None and activity.path != "":
+                if activity.path:
                     activities_paths.append(activity.path)
 
+            pathways = _collect_unique_pathways(activities)
+
             if not pathways and len(activities_paths) > 0:
                 self.run_activities_analysis(activities, extent)
 
@@ -1032,25 +2323,45 @@ class ScenarioAnalysisTask(QgsTask):
 
             normalization_index = carbon_coefficient + suitability_index
 
+            quantize_outputs = self.get_settings_value(
+                Settings.QUANTIZE_OUTPUTS, default=False, setting_type=bool
+            )
+
+            # All the pathways are normalized using the same feedback
+            feedback = self.get_processing_feedback()
+
+            # The raster calculator runs the normalization expression on
+            # the OpenCL device when available, otherwise aligned pathways
+            # are normalized block by block on the CPU.
+            use_opencl = opencl_enabled()
+
             for pathway in pathways:
                 layers = []
                 normalized_pathways_directory = os.path.join(
                     self.scenario_directory, "normalized_pathways"
                 )
                 FileUtils.create_new_dir(normalized_pathways_directory)
-                file_name = clean_filename(pathway.name.replace(" ", "_"))
+                file_name = _output_file_name(pathway.name)
 
+                output_suffix = _stable_suffix(
+                    _file_key(pathway.path) or pathway.path,
+                    normalization_index,
+                    quantize_outputs,
+                    extent,
+                )
                 output_file = os.path.join(
                     normalized_pathways_directory,
-                    f"{file_name}_{str(uuid.uuid4())[:4]}.tif",
+                    f"{file_name}_{output_suffix}.tif",
                 )
 
-                pathway_layer = QgsRasterLayer(pathway.path, pathway.name)
-                provider = pathway_layer.dataProvider()
-                band_statistics = provider.bandStatistics(1)
+                # Aligned layers are cropped to the analysis extent, their
+                # statistics are read from the whole source layer.
+                band_statistics = raster_band_statistics(
+                    self.aligned_sources.get(pathway.path, pathway.path)
+                )
 
-                min_value = band_statistics.minimumValue
-                max_value = band_statistics.maximumValue
+                min_value = band_statistics.minimum
+                max_value = band_statistics.maximum
 
                 layer_name = Path(pathway.path).stem
 
@@ -1070,6 +2381,17 @@ class ScenarioAnalysisTask(QgsTask):
                         )
                     )
 
+                # Pathways that are already normalized are reused as they are
+                if _is_identity_normalization(
+                    min_value,
+                    max_value,
+                    normalization_index if normalization_index > 0 else 1.0,
+                ) and rasters_aligned(layers, extent):
+                    pathway.path = _reuse_layer(
+                        pathway.path, output_file, temporary_output
+                    )
+                    continue
+
                 if normalization_index > 0:
                     expression = (
                         f" {normalization_index} * "
@@ -1100,18 +2422,42 @@ class ScenarioAnalysisTask(QgsTask):
                     f"Used parameters for normalization of the pathways: {alg_params} \n"
                 )
 
-                self.feedback = QgsProcessingFeedback()
-
-                self.feedback.progressChanged.connect(self.update_progress)
-
                 if self.processing_cancelled:
                     return False
 
-                results = processing.run(
+                # Pathways aligned with the extent are normalized directly,
+                # skipping the raster calculator expression evaluation.
+                if not use_opencl and rasters_aligned(layers, extent):
+                    if temporary_output:
+                        output = QgsProcessingUtils.generateTempFilename(
+                            f"{file_name}.tif"
+                        )
+                    if normalize_raster(
+                        pathway.path,
+                        output,
+                        min_value,
+                        max_value,
+                        normalization_index if normalization_index > 0 else 1.0,
+                        feedback,
+                        quantize_outputs,
+                    ):
+                        pathway.path = output
+                        continue
+
+                    if self.processing_cancelled:
+                        return False
+
+                    alg_params["OUTPUT"] = (
+                        QgsProcessing.TEMPORARY_OUTPUT
+                        if temporary_output
+                        else output_file
+                    )
+
+                results = self.run_algorithm(
                     "qgis:rastercalculator",
                     alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
+                    self.processing_context,
+                    feedback,
                 )
 
                 # self.replace_nodata(results["OUTPUT"], output_file, -9999)
@@ -1149,18 +2495,19 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Creating activity layers from pathways"))
 
+        jobs = []
+        jobs_activities = []
+
         try:
             for activity in activities:
                 activities_directory = os.path.join(
                     self.scenario_directory, "activities"
                 )
                 FileUtils.create_new_dir(activities_directory)
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
 
                 layers = []
-                if not activity.pathways and (
-                    activity.path is None or activity.path == ""
-                ):
+                if not activity.pathways and not activity.path:
                     self.set_info_message(
                         tr(
                             f"No defined activity pathways or a"
@@ -1176,7 +2523,7 @@ class ScenarioAnalysisTask(QgsTask):
                     return False
 
                 output_file = os.path.join(
-                    activities_directory, f"{file_name}_{str(uuid.uuid4())[:4]}.tif"
+                    activities_directory, f"{file_name}_{self.next_output_suffix()}.tif"
                 )
 
                 # Due to the activities base class
@@ -1184,12 +2531,30 @@ class ScenarioAnalysisTask(QgsTask):
                 # the activity either contain a path or
                 # pathways
 
-                if activity.path is not None and activity.path != "":
+                if activity.path:
                     layers = [activity.path]
 
                 for pathway in activity.pathways:
                     layers.append(pathway.path)
 
+                # The sum of a single pathway is the pathway itself, temporary
+                # activities are then only virtual rasters of their pathway
+                # when the pathway already has the extent and nodata value
+                # of the cell statistics outputs.
+                if (
+                    temporary_output
+                    and len(layers) == 1
+                    and not activity.path
+                    and raster_nodata_value(layers[0]) == -9999
+                    and rasters_aligned(layers, extent)
+                ):
+                    virtual_output = QgsProcessingUtils.generateTempFilename(
+                        f"{file_name}.vrt"
+                    )
+                    if create_virtual_raster(layers[0], virtual_output):
+                        activity.path = virtual_output
+                        continue
+
                 output = (
                     QgsProcessing.TEMPORARY_OUTPUT if temporary_output else output_file
                 )
@@ -1210,20 +2575,21 @@ class ScenarioAnalysisTask(QgsTask):
                     f"Used parameters for " f"activities generation: {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
-
-                feedback.progressChanged.connect(self.update_progress)
-
-                if self.processing_cancelled:
-                    return False
-
-                results = processing.run(
-                    "native:cellstatistics",
-                    alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
+                jobs.append(
+                    partial(self.run_algorithm, "native:cellstatistics", alg_params)
                 )
-                activity.path = results["OUTPUT"]
+                jobs_activities.append(activity)
+
+            if self.processing_cancelled:
+                return False
+
+            # The activities layers are independent of each other hence
+            # they are created concurrently.
+            results = self.run_concurrent_jobs(jobs)
+
+            for activity, result in zip(jobs_activities, results):
+                if result is not None:
+                    activity.path = result["OUTPUT"]
 
         except Exception as e:
             self.log_message(f"Problem creating activity layers, {e}")
@@ -1259,6 +2625,9 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Masking activities using the saved masked layers"))
 
+        # All the activities are masked using the same feedback
+        self.get_processing_feedback()
+
         try:
             if len(masking_layers) < 1:
                 return False
@@ -1307,7 +2676,7 @@ class ScenarioAnalysisTask(QgsTask):
                 return False
 
             for activity in activities:
-                if activity.path is None or activity.path == "":
+                if not activity.path:
                     if not self.processing_cancelled:
                         self.set_info_message(
                             tr(
@@ -1334,11 +2703,11 @@ class ScenarioAnalysisTask(QgsTask):
                     self.scenario_directory, "masked_activities"
                 )
                 FileUtils.create_new_dir(masked_activities_directory)
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
 
                 output_file = os.path.join(
                     masked_activities_directory,
-                    f"{file_name}_{str(uuid.uuid4())[:4]}.tif",
+                    f"{file_name}_{self.next_output_suffix()}.tif",
                 )
 
                 output = (
@@ -1377,10 +2746,6 @@ class ScenarioAnalysisTask(QgsTask):
                     f"using project mask layers: {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
-
-                feedback.progressChanged.connect(self.update_progress)
-
                 if self.processing_cancelled:
                     return False
 
@@ -1425,6 +2790,9 @@ class ScenarioAnalysisTask(QgsTask):
             tr("Masking activities using their respective mask layers.")
         )
 
+        # All the activities are masked using the same feedback
+        self.get_processing_feedback()
+
         try:
             for activity in activities:
                 masking_layers = activity.mask_paths
@@ -1495,7 +2863,7 @@ class ScenarioAnalysisTask(QgsTask):
                         f"is not a valid layer."
                     )
                     continue
-                if activity.path is None or activity.path == "":
+                if not activity.path:
                     if not self.processing_cancelled:
                         self.set_info_message(
                             tr(
@@ -1522,11 +2890,11 @@ class ScenarioAnalysisTask(QgsTask):
                     self.scenario_directory, "final_masked_activities"
                 )
                 FileUtils.create_new_dir(masked_activities_directory)
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
 
                 output_file = os.path.join(
                     masked_activities_directory,
-                    f"{file_name}_{str(uuid.uuid4())[:4]}.tif",
+                    f"{file_name}_{self.next_output_suffix()}.tif",
                 )
 
                 output = (
@@ -1565,10 +2933,6 @@ class ScenarioAnalysisTask(QgsTask):
                     f" using activity respective mask layer(s): {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
-
-                feedback.progressChanged.connect(self.update_progress)
-
                 if self.processing_cancelled:
                     return False
 
@@ -1715,9 +3079,17 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Applying sieve function to the activities"))
 
+        # All the activities are sieved using the same feedback
+        self.get_processing_feedback()
+
+        threshold_value = float(
+            self.get_settings_value(Settings.SIEVE_THRESHOLD, default=10.0)
+        )
+        mask_layer = self.get_settings_value(Settings.SIEVE_MASK_PATH, default="")
+
         try:
             for model in models:
-                if model.path is None or model.path == "":
+                if not model.path:
                     if not self.processing_cancelled:
                         self.set_info_message(
                             tr(
@@ -1744,18 +3116,10 @@ class ScenarioAnalysisTask(QgsTask):
                     self.scenario_directory, "sieved_ims"
                 )
                 FileUtils.create_new_dir(sieved_ims_directory)
-                file_name = clean_filename(model.name.replace(" ", "_"))
+                file_name = _output_file_name(model.name)
 
                 output_file = os.path.join(
-                    sieved_ims_directory, f"{file_name}_{str(uuid.uuid4())[:4]}.tif"
-                )
-
-                threshold_value = float(
-                    self.get_settings_value(Settings.SIEVE_THRESHOLD, default=10.0)
-                )
-
-                mask_layer = self.get_settings_value(
-                    Settings.SIEVE_MASK_PATH, default=""
+                    sieved_ims_directory, f"{file_name}_{self.next_output_suffix()}.tif"
                 )
 
                 output = (
@@ -1876,10 +3240,6 @@ class ScenarioAnalysisTask(QgsTask):
                     feedback=self.feedback,
                 )
 
-                feedback = QgsProcessingFeedback()
-
-                feedback.progressChanged.connect(self.update_progress)
-
                 if self.processing_cancelled:
                     return False
 
@@ -1923,9 +3283,25 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Normalization of the activities"))
 
+        use_opencl = opencl_enabled()
+
+        carbon_coefficient = float(
+            self.get_settings_value(Settings.CARBON_COEFFICIENT, default=0.0)
+        )
+        suitability_index = float(
+            self.get_settings_value(Settings.PATHWAY_SUITABILITY_INDEX, default=0)
+        )
+        normalization_index = carbon_coefficient + suitability_index
+        quantize = self.get_settings_value(
+            Settings.QUANTIZE_OUTPUTS, default=False, setting_type=bool
+        )
+
+        jobs = []
+        jobs_activities = []
+
         try:
             for activity in activities:
-                if activity.path is None or activity.path == "":
+                if not activity.path:
                     if not self.processing_cancelled:
                         self.set_info_message(
                             tr(
@@ -1953,19 +3329,17 @@ class ScenarioAnalysisTask(QgsTask):
                     self.scenario_directory, "normalized_activities"
                 )
                 FileUtils.create_new_dir(normalized_activities_directory)
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
 
                 output_file = os.path.join(
                     normalized_activities_directory,
-                    f"{file_name}_{str(uuid.uuid4())[:4]}.tif",
+                    f"{file_name}_{self.next_output_suffix()}.tif",
                 )
 
-                activity_layer = QgsRasterLayer(activity.path, activity.name)
-                provider = activity_layer.dataProvider()
-                band_statistics = provider.bandStatistics(1)
+                band_statistics = raster_band_statistics(activity.path)
 
-                min_value = band_statistics.minimumValue
-                max_value = band_statistics.maximumValue
+                min_value = band_statistics.minimum
+                max_value = band_statistics.maximum
 
                 self.log_message(
                     f"Found minimum {min_value} and "
@@ -1976,18 +3350,6 @@ class ScenarioAnalysisTask(QgsTask):
 
                 layers.append(activity.path)
 
-                carbon_coefficient = float(
-                    self.get_settings_value(Settings.CARBON_COEFFICIENT, default=0.0)
-                )
-
-                suitability_index = float(
-                    self.get_settings_value(
-                        Settings.PATHWAY_SUITABILITY_INDEX, default=0
-                    )
-                )
-
-                normalization_index = carbon_coefficient + suitability_index
-
                 if normalization_index > 0:
                     expression = (
                         f" {normalization_index} * "
@@ -2019,20 +3381,46 @@ class ScenarioAnalysisTask(QgsTask):
                     f"Used parameters for normalization of the activities: {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
+                scale = normalization_index if normalization_index > 0 else 1.0
+                if _is_identity_normalization(
+                    min_value, max_value, scale
+                ) and rasters_aligned(layers, extent):
+                    # Activities that are already normalized are reused as they are
+                    activity.path = _reuse_layer(
+                        activity.path, output_file, temporary_output
+                    )
+                    continue
+
+                if use_opencl:
+                    job = partial(
+                        self.run_algorithm, "qgis:rastercalculator", alg_params
+                    )
+                else:
+                    # Aligned activities are normalized block by block,
+                    # skipping the raster calculator expression evaluation.
+                    job = partial(
+                        self.run_raster_calculation,
+                        alg_params,
+                        partial(
+                            _normalize_layers,
+                            min_value=min_value,
+                            max_value=max_value,
+                            scale=scale,
+                            quantize=quantize,
+                        ),
+                        f"{file_name}.tif",
+                    )
+                jobs.append(job)
+                jobs_activities.append(activity)
 
-                feedback.progressChanged.connect(self.update_progress)
+            if self.processing_cancelled:
+                return False
 
-                if self.processing_cancelled:
-                    return False
+            results = self.run_concurrent_jobs(jobs)
 
-                results = processing.run(
-                    "qgis:rastercalculator",
-                    alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
-                )
-                activity.path = results["OUTPUT"]
+            for activity, result in zip(jobs_activities, results):
+                if result is not None:
+                    activity.path = result["OUTPUT"]
 
         except Exception as e:
             self.log_message(f"Problem normalizing activity layers, {e} \n")
@@ -2071,12 +3459,19 @@ class ScenarioAnalysisTask(QgsTask):
         self.set_status_message(tr(f"Weighting activities"))
 
         weighted_activities = []
+        directory_listing = _DirectoryListing()
+        priority_layers_index = _PriorityLayersIndex(self.get_priority_layers())
+
+        use_opencl = opencl_enabled()
+
+        jobs = []
+        jobs_activities = []
 
         try:
             for original_activity in activities:
                 activity = clone_activity(original_activity)
 
-                if activity.path is None or activity.path == "":
+                if not activity.path:
                     self.set_info_message(
                         tr(
                             f"Problem when running activities weighting, "
@@ -2093,8 +3488,10 @@ class ScenarioAnalysisTask(QgsTask):
 
                 basenames = []
                 layers = []
+                coefficients = []
 
                 layers.append(activity.path)
+                coefficients.append(1.0)
                 basenames.append(f'"{Path(activity.path).stem}@1"')
 
                 if not any(priority_layers_groups):
@@ -2107,57 +3504,36 @@ class ScenarioAnalysisTask(QgsTask):
                     )
                     return
 
-                if activity.priority_layers is None or activity.priority_layers is []:
+                if not activity.priority_layers:
+                    # Activities without priority layers are kept in the
+                    # scenario without being weighted.
                     self.log_message(
                         f"There are no associated "
-                        f"priority weighting layers for activity {activity.name}"
+                        f"priority weighting layers for activity {activity.name}, "
+                        f"using the activity layer as it is \n"
                     )
+                    jobs_activities.append((activity, None))
                     continue
 
-                settings_activity = self.get_activity(str(activity.uuid))
-
-                for layer in settings_activity.priority_layers:
-                    if layer is None:
-                        continue
-
-                    settings_layer = self.get_priority_layer(layer.get("uuid"))
-                    if settings_layer is None:
-                        continue
-
-                    pwl = settings_layer.get("path")
-
-                    missing_pwl_message = (
-                        f"Path {pwl} for priority "
-                        f"weighting layer {layer.get('name')} "
-                        f"doesn't exist, skipping the layer "
-                        f"from the activity {activity.name} weighting."
+                for pwl, coefficient in self.get_activity_weighting_layers(
+                    activity, directory_listing, priority_layers_index
+                ):
+                    if pwl not in layers:
+                        layers.append(pwl)
+                        coefficients.append(0.0)
+                    coefficients[layers.index(pwl)] += coefficient
+                    basenames.append(f'({coefficient}*"{Path(pwl).stem}@1")')
+
+                if len(basenames) <= 1:
+                    # Without any weighting layer the weighted activity is
+                    # the activity itself, hence it isn't rewritten.
+                    self.log_message(
+                        f"There are no priority weighting layers with positive "
+                        f"coefficients for activity {activity.name}, "
+                        f"using the activity layer as it is \n"
                     )
-                    if pwl is None:
-                        self.log_message(missing_pwl_message)
-                        continue
-
-                    pwl_path = Path(pwl)
-
-                    if not pwl_path.exists():
-                        self.log_message(missing_pwl_message)
-                        continue
-
-                    path_basename = pwl_path.stem
-
-                    for priority_layer in self.get_priority_layers():
-                        if priority_layer.get("name") == layer.get("name"):
-                            for group in priority_layer.get("groups", []):
-                                value = group.get("value")
-                                coefficient = float(value)
-                                if coefficient > 0:
-                                    if pwl not in layers:
-                                        layers.append(pwl)
-                                    basenames.append(
-                                        f'({coefficient}*"{path_basename}@1")'
-                                    )
-
-                if basenames is []:
-                    return [], True
+                    jobs_activities.append((activity, None))
+                    continue
 
                 weighted_activities_directory = os.path.join(
                     self.scenario_directory, "weighted_activities"
@@ -2165,10 +3541,10 @@ class ScenarioAnalysisTask(QgsTask):
 
                 FileUtils.create_new_dir(weighted_activities_directory)
 
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
                 output_file = os.path.join(
                     weighted_activities_directory,
-                    f"{file_name}_{str(uuid.uuid4())[:4]}.tif",
+                    f"{file_name}_{self.next_output_suffix()}.tif",
                 )
                 expression = " + ".join(basenames)
 
@@ -2190,25 +3566,358 @@ class ScenarioAnalysisTask(QgsTask):
                     f" Used parameters for calculating weighting activities {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
+                if use_opencl:
+                    job = partial(
+                        self.run_algorithm, "qgis:rastercalculator", alg_params
+                    )
+                else:
+                    # Aligned layers are weighted block by block, skipping
+                    # the raster calculator expression evaluation.
+                    job = partial(
+                        self.run_raster_calculation,
+                        alg_params,
+                        partial(calculate_weighted_sum, coefficients=coefficients),
+                        f"{file_name}.tif",
+                    )
+                jobs.append(job)
+                jobs_activities.append((activity, len(jobs) - 1))
+
+            if self.processing_cancelled:
+                return [], False
 
-                feedback.progressChanged.connect(self.update_progress)
+            # The activities are weighted concurrently, the weighted
+            # activities keep the order of the passed activities.
+            results = self.run_concurrent_jobs(jobs)
 
-                if self.processing_cancelled:
+            for activity, job_index in jobs_activities:
+                if job_index is not None:
+                    result = results[job_index]
+                    if result is None:
+                        continue
+                    activity.path = result["OUTPUT"]
+                    self.weighting_outputs.add(activity.path)
+                weighted_activities.append(activity)
+
+        except Exception as e:
+            self.log_message(f"Problem weighting activities, {e}\n")
+            self.cancel_task(e)
+            return None, False
+
+        return weighted_activities, True
+
+    def get_activity_weighting_layers(
+        self, activity, directory_listing=None, priority_layers_index=None
+    ) -> typing.List[typing.Tuple[str, float]]:
+        """Gets the priority weighting layers paths and their coefficients
+        used for weighting the passed activity.
+
+        A layer is returned with the sum of its groups positive values as
+        its coefficient, layers with missing paths are skipped.
+
+        :param activity: Activity to be weighted
+        :type activity: Activity
+
+        :param directory_listing: Listing used to check the layers existence
+        :type directory_listing: _DirectoryListing
+
+        :param priority_layers_index: Snapshot of the priority layers settings,
+        a new snapshot is read when not passed.
+        :type priority_layers_index: _PriorityLayersIndex
+
+        :returns: Pairs of the priority weighting layer path and coefficient
+        :rtype: typing.List[typing.Tuple[str, float]]
+        """
+        directory_listing = directory_listing or _DirectoryListing()
+        priority_layers_index = priority_layers_index or _PriorityLayersIndex(
+            self.get_priority_layers()
+        )
+        weighting_layers = []
+
+        settings_activity = self.get_activity(str(activity.uuid))
+
+        for layer in settings_activity.priority_layers:
+            if layer is None:
+                continue
+
+            settings_layer = priority_layers_index.get(layer.get("uuid"))
+            if settings_layer is None:
+                continue
+
+            pwl = settings_layer.get("path")
+
+            missing_pwl_message = (
+                f"Path {pwl} for priority "
+                f"weighting layer {layer.get('name')} "
+                f"doesn't exist, skipping the layer "
+                f"from the activity {activity.name} weighting."
+            )
+            if pwl is None:
+                self.log_message(missing_pwl_message)
+                continue
+
+            if not directory_listing.exists(pwl):
+                self.log_message(missing_pwl_message)
+                continue
+
+            pwl = self.aligned_layers.get(pwl, pwl)
+
+            coefficient = priority_layers_index.coefficient(layer.get("name"))
+            if coefficient > 0:
+                weighting_layers.append((pwl, coefficient))
+
+        return weighting_layers
+
+    def activities_weighting_fusable(
+        self, activities, priority_layers_groups, extent
+    ) -> bool:
+        """Checks whether the normalization and weighting of the passed
+        activities can be done in a single block-wise pass.
+
+        This is the case when OpenCL isn't used and the activities layers
+        are aligned with their priority weighting layers on the extent.
+
+        :param activities: List of the analyzed activities
+        :type activities: typing.List[Activity]
+
+        :param priority_layers_groups: Used priority layers groups and their values
+        :type priority_layers_groups: dict
+
+        :param extent: Selected area of interest extent
+        :type extent: str
+
+        :returns: Whether the stages can be fused
+        :rtype: bool
+        """
+        if opencl_enabled() or not any(priority_layers_groups):
+            return False
+
+        directory_listing = _DirectoryListing()
+        priority_layers_index = _PriorityLayersIndex(self.get_priority_layers())
+        for activity in activities:
+            if not activity.path:
+                return False
+            layers = [activity.path] + [
+                pwl
+                for pwl, _ in self.get_activity_weighting_layers(
+                    activity, directory_listing, priority_layers_index
+                )
+            ]
+            if not rasters_aligned(layers, extent):
+                return False
+
+        return True
+
+    def run_activities_normalization_weighting(
+        self,
+        activities,
+        priority_layers_groups,
+        extent,
+        normalized_temporary_output=False,
+        weighted_temporary_output=False,
+    ):
+        """Runs the normalization and the weighting of the activities in
+        a single pass, each activity layer and its priority weighting layers
+        are read once and both the normalized and weighted activity layers
+        are written block by block.
+
+        The normalization and the weighting use the same formulas of the
+        separate normalization and weighting stages, see
+        run_activities_normalization and run_activities_weighting.
+
+        :param activities: List of the analyzed activities
+        :type activities: typing.List[Activity]
+
+        :param priority_layers_groups: Used priority layers groups and their values
+        :type priority_layers_groups: dict
+
+        :param extent: Selected area of interest extent
+        :type extent: str
+
+        :param normalized_temporary_output: Whether to save the normalized
+        activities as temporary files
+        :type normalized_temporary_output: bool
+
+        :param weighted_temporary_output: Whether to save the weighted
+        activities as temporary files
+        :type weighted_temporary_output: bool
+
+        :returns: A tuple with the weighted activities outputs and
+        a value of whether the task operations was successful
+        :rtype: typing.Tuple[typing.List, bool]
+        """
+        if self.processing_cancelled:
+            return [], False
+
+        self.set_status_message(tr("Normalization and weighting of the activities"))
+
+        carbon_coefficient = float(
+            self.get_settings_value(Settings.CARBON_COEFFICIENT, default=0.0)
+        )
+        suitability_index = float(
+            self.get_settings_value(Settings.PATHWAY_SUITABILITY_INDEX, default=0)
+        )
+        normalization_index = carbon_coefficient + suitability_index
+        scale = normalization_index if normalization_index > 0 else 1.0
+        quantize = self.get_settings_value(
+            Settings.QUANTIZE_OUTPUTS, default=False, setting_type=bool
+        )
+
+        normalized_directory = os.path.join(
+            self.scenario_directory, "normalized_activities"
+        )
+        weighted_directory = os.path.join(
+            self.scenario_directory, "weighted_activities"
+        )
+        FileUtils.create_new_dir(normalized_directory)
+        FileUtils.create_new_dir(weighted_directory)
+
+        directory_listing = _DirectoryListing()
+        priority_layers_index = _PriorityLayersIndex(self.get_priority_layers())
+        jobs = []
+        jobs_outputs = []
+
+        def output_path(directory, file_name, temporary_output):
+            if temporary_output:
+                return QgsProcessingUtils.generateTempFilename(f"{file_name}.tif")
+            return os.path.join(
+                directory, f"{file_name}_{self.next_output_suffix()}.tif"
+            )
+
+        def normalize_weight(
+            input_path,
+            weighting_layers,
+            normalized_output,
+            weighted_output,
+            min_value,
+            max_value,
+            context,
+            feedback,
+        ):
+            weighting_paths = [pwl for pwl, _ in weighting_layers]
+            coefficients = [coefficient for _, coefficient in weighting_layers]
+
+            if _is_identity_normalization(min_value, max_value, scale):
+                # Activities that are already normalized are reused as they
+                # are and only weighted.
+                normalized_output = _reuse_layer(
+                    input_path, normalized_output, normalized_temporary_output
+                )
+                if weighted_output is None or calculate_weighted_sum(
+                    [input_path] + weighting_paths,
+                    weighted_output,
+                    [1.0] + coefficients,
+                    feedback=feedback,
+                ):
+                    return normalized_output
+                return None
+
+            if weighted_output is None:
+                calculated = normalize_raster(
+                    input_path,
+                    normalized_output,
+                    min_value,
+                    max_value,
+                    scale,
+                    feedback=feedback,
+                    quantize=quantize,
+                )
+            else:
+                calculated = normalize_weight_raster(
+                    input_path,
+                    weighting_paths,
+                    coefficients,
+                    normalized_output,
+                    weighted_output,
+                    min_value,
+                    max_value,
+                    scale,
+                    feedback=feedback,
+                    quantize=quantize,
+                )
+
+            return normalized_output if calculated else None
+
+        try:
+            for activity in activities:
+                statistics = raster_band_statistics(activity.path)
+                if statistics is None:
+                    self.log_message(
+                        f"Problem reading the statistics of the "
+                        f"activity {activity.name} layer {activity.path} \n"
+                    )
                     return [], False
 
-                results = processing.run(
-                    "qgis:rastercalculator",
-                    alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
+                self.log_message(
+                    f"Found minimum {statistics.minimum} and "
+                    f"maximum {statistics.maximum} for activity {activity.name} \n"
                 )
-                activity.path = results["OUTPUT"]
 
-                weighted_activities.append(activity)
+                # Activities without priority layers are kept in the
+                # scenario without being weighted.
+                weighting_layers = (
+                    self.get_activity_weighting_layers(
+                        activity, directory_listing, priority_layers_index
+                    )
+                    if activity.priority_layers
+                    else []
+                )
+
+                file_name = _output_file_name(activity.name)
+                normalized_output = output_path(
+                    normalized_directory, file_name, normalized_temporary_output
+                )
+                # Activities without weighting layers with positive
+                # coefficients are used as their weighted activities.
+                weighted_output = (
+                    output_path(
+                        weighted_directory, file_name, weighted_temporary_output
+                    )
+                    if weighting_layers
+                    else None
+                )
+
+                self.log_message(
+                    f"Normalizing activity {activity.name} into {normalized_output} "
+                    f"and weighting it with {weighting_layers} into "
+                    f"{weighted_output} \n"
+                )
+
+                jobs.append(
+                    partial(
+                        normalize_weight,
+                        activity.path,
+                        weighting_layers,
+                        normalized_output,
+                        weighted_output,
+                        statistics.minimum,
+                        statistics.maximum,
+                    )
+                )
+                jobs_outputs.append((activity, weighted_output))
+
+            if self.processing_cancelled:
+                return [], False
+
+            results = self.run_concurrent_jobs(jobs)
+
+            weighted_activities = []
+            for result, (activity, weighted) in zip(results, jobs_outputs):
+                if not result:
+                    self.log_message(
+                        f"Problem normalizing and weighting activity {activity.name}\n"
+                    )
+                    return [], False
+
+                activity.path = result
+
+                weighted_activity = clone_activity(activity)
+                if weighted is not None:
+                    weighted_activity.path = weighted
+                    self.weighting_outputs.add(weighted)
+                weighted_activities.append(weighted_activity)
 
         except Exception as e:
-            self.log_message(f"Problem weighting activities, {e}\n")
+            self.log_message(f"Problem normalizing and weighting activities, {e}\n")
             self.cancel_task(e)
             return None, False
 
@@ -2235,9 +3944,12 @@ class ScenarioAnalysisTask(QgsTask):
 
         self.set_status_message(tr("Updating weighted activity values"))
 
+        jobs = []
+        jobs_activities = []
+
         try:
             for activity in activities:
-                if activity.path is None or activity.path == "":
+                if not activity.path:
                     self.set_info_message(
                         tr(
                             f"Problem when running activity updates, "
@@ -2254,13 +3966,13 @@ class ScenarioAnalysisTask(QgsTask):
 
                 layers = [activity.path]
 
-                file_name = clean_filename(activity.name.replace(" ", "_"))
+                file_name = _output_file_name(activity.name)
 
                 output_file = os.path.join(
                     self.scenario_directory, "weighted_activities"
                 )
                 output_file = os.path.join(
-                    output_file, f"{file_name}_{str(uuid.uuid4())[:4]}_cleaned.tif"
+                    output_file, f"{file_name}_{self.next_output_suffix()}_cleaned.tif"
                 )
 
                 # Actual processing calculation
@@ -2286,20 +3998,26 @@ class ScenarioAnalysisTask(QgsTask):
                     f"updates on the weighted activities: {alg_params} \n"
                 )
 
-                feedback = QgsProcessingFeedback()
+                if self.is_weighting_output(activity.path):
+                    # Weighted layers created by the task are cleaned in place
+                    job = partial(self.run_zero_masking, alg_params)
+                else:
+                    job = partial(
+                        self.run_algorithm, "native:cellstatistics", alg_params
+                    )
+                jobs.append(job)
+                jobs_activities.append(activity)
 
-                feedback.progressChanged.connect(self.update_progress)
+            if self.processing_cancelled:
+                return False
 
-                if self.processing_cancelled:
-                    return False
+            # The cleaned activities are written concurrently, overlapping
+            # the disk writes of the activities outputs.
+            results = self.run_concurrent_jobs(jobs)
 
-                results = processing.run(
-                    "native:cellstatistics",
-                    alg_params,
-                    context=self.processing_context,
-                    feedback=self.feedback,
-                )
-                activity.path = results["OUTPUT"]
+            for activity, result in zip(jobs_activities, results):
+                if result is not None:
+                    activity.path = result["OUTPUT"]
 
         except Exception as e:
             self.log_message(f"Problem cleaning activities, {e}")
@@ -2308,6 +4026,58 @@ class ScenarioAnalysisTask(QgsTask):
 
         return True
 
+    def is_weighting_output(self, layer_path) -> bool:
+        """Checks whether the layer in the passed path was written by the
+        activities weighting of the task, such layers aren't shared with
+        other analysis outputs and can be updated in place.
+
+        :param layer_path: Layer path
+        :type layer_path: str
+
+        :returns: Whether the layer is a weighting output
+        :rtype: bool
+        """
+        return bool(layer_path) and layer_path in self.weighting_outputs
+
+    def run_zero_masking(
+        self,
+        parameters: dict,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> typing.Dict:
+        """Sets the zero values of the input layer as nodata as a job.
+
+        When the layer is aligned with the extent its zero values are masked
+        in place, otherwise the layer is rewritten using the cell statistics
+        algorithm with the passed parameters.
+
+        :param parameters: Cell statistics algorithm parameters.
+        :type parameters: dict
+
+        :param context: Processing context for the job.
+        :type context: QgsProcessingContext
+
+        :param feedback: Feedback for the job.
+        :type feedback: QgsProcessingFeedback
+
+        :returns: The masking results, None if the masking was cancelled.
+        :rtype: dict
+        """
+        layer_path = parameters["INPUT"][0]
+        if rasters_aligned([layer_path], parameters["EXTENT"]) and mask_zero_values(
+            layer_path, feedback
+        ):
+            return {"OUTPUT": layer_path}
+
+        if self.processing_cancelled or feedback.isCanceled():
+            return None
+
+        # The in place masking either updates the whole layer or returns
+        # before rewriting any of its values, so the layer is unchanged here.
+        return self.run_algorithm(
+            "native:cellstatistics", parameters, context, feedback
+        )
+
     def run_highest_position_analysis(self, temporary_output=False):
         """Runs the highest position analysis which is last step
         in scenario analysis. Uses the activities set by the current ongoing
@@ -2343,22 +4113,28 @@ class ScenarioAnalysisTask(QgsTask):
         )
 
         try:
-            layers = {}
+            # Only the layers sources are passed to the highest position
+            # calculation hence the layers are not loaded.
+            layers_sources = {}
 
             self.set_status_message(tr("Calculating the highest position"))
 
             for activity in self.analysis_weighted_activities:
-                if activity.path is not None and activity.path != "":
-                    raster_layer = QgsRasterLayer(activity.path, activity.name)
-                    layers[activity.name] = (
-                        raster_layer if raster_layer is not None else None
-                    )
+                if activity.path:
+                    layers_sources[activity.name] = activity.path
                 else:
                     for pathway in activity.pathways:
-                        layers[activity.name] = QgsRasterLayer(pathway.path)
-
-            source_crs = QgsCoordinateReferenceSystem("EPSG:4326")
-            dest_crs = list(layers.values())[0].crs() if len(layers) > 0 else source_crs
+                        layers_sources[activity.name] = pathway.path
+
+            first_source = next(iter(layers_sources.values()), None)
+            dest_crs = QgsCoordinateReferenceSystem("EPSG:4326")
+            if first_source is not None:
+                metadata = raster_metadata(first_source)
+                dest_crs = (
+                    QgsCoordinateReferenceSystem.fromWkt(metadata.crs_wkt)
+                    if metadata is not None
+                    else QgsRasterLayer(first_source).crs()
+                )
 
             extent_string = (
                 f"{passed_extent.xMinimum()},{passed_extent.xMaximum()},"
@@ -2389,7 +4165,7 @@ class ScenarioAnalysisTask(QgsTask):
 
             for activity_name in all_activity_names:
                 if activity_name in activity_names:
-                    sources.append(layers[activity_name].source())
+                    sources.append(layers_sources[activity_name])
 
             self.log_message(
                 f"Layers sources {[Path(source).stem for source in sources]}"
@@ -2404,9 +4180,7 @@ class ScenarioAnalysisTask(QgsTask):
                 "INPUT_RASTERS": sources,
                 "EXTENT": extent_string,
                 "OUTPUT_NODATA_VALUE": -9999,
-                "REFERENCE_LAYER": list(layers.values())[0]
-                if len(layers) >= 1
-                else None,
+                "REFERENCE_LAYER": first_source,
                 "OUTPUT": output_file,
             }
 
@@ -2414,19 +4188,14 @@ class ScenarioAnalysisTask(QgsTask):
                 f"Used parameters for highest position analysis {alg_params} \n"
             )
 
-            self.feedback = QgsProcessingFeedback()
-
-            self.feedback.progressChanged.connect(self.update_progress)
+            self.get_processing_feedback()
 
             if self.processing_cancelled:
                 return False
 
-            self.output = processing.run(
-                "native:highestpositioninrasterstack",
-                alg_params,
-                context=self.processing_context,
-                feedback=self.feedback,
-            )
+            self.output = self.run_highest_position(alg_params)
+            if self.output is None:
+                return False
 
         except Exception as err:
             self.log_message(
@@ -2439,3 +4208,43 @@ class ScenarioAnalysisTask(QgsTask):
             return False
 
         return True
+
+    def run_highest_position(self, parameters: dict) -> typing.Dict:
+        """Runs the highest position calculation of the scenario.
+
+        When the input layers are aligned with the extent the calculation is
+        done block by block directly on the rasters, otherwise the highest
+        position in raster stack algorithm is used with the passed parameters.
+
+        :param parameters: Highest position algorithm parameters.
+        :type parameters: dict
+
+        :returns: The calculation results, None if the calculation
+        was cancelled.
+        :rtype: dict
+        """
+        sources = parameters["INPUT_RASTERS"]
+        if sources and rasters_aligned(sources, parameters["EXTENT"]):
+            output = parameters["OUTPUT"]
+            if output == QgsProcessing.TEMPORARY_OUTPUT:
+                output = QgsProcessingUtils.generateTempFilename(
+                    f"{SCENARIO_OUTPUT_FILE_NAME}.tif"
+                )
+
+            if calculate_highest_position(sources, output, self.feedback):
+                return {"OUTPUT": output}
+
+            if self.processing_cancelled or self.feedback.isCanceled():
+                return None
+
+            self.log_message(
+                f"Problem calculating the highest position {output} directly, "
+                f"using the highest position algorithm instead \n"
+            )
+
+        return self.run_algorithm(
+            "native:highestpositioninrasterstack",
+            parameters,
+            self.processing_context,
+            self.feedback,
+        )
@@ -21,6 +21,7 @@ from cplus_plugin.gui.qgis_cplus_main import QgisCplusMain
 from cplus_plugin.lib.financials import (
     calculate_activity_npv,
     compute_discount_value,
+    compute_discount_values,
     create_npv_pwls,
 )
 from cplus_plugin.utils import FileUtils
@@ -74,6 +75,24 @@ class TestFinancialNpv(TestCase):
 
         self.assertEqual(round(discount_rate, 2), 19215.65)
 
+    def test_discount_values_calculation(self):
+        """Test the computation of discounted values for consecutive years."""
+        discounted_values = compute_discount_values(
+            [70000, 70000, 70000], [48000, 48000, 48000], 7.0
+        )
+
+        self.assertEqual(len(discounted_values), 3)
+        self.assertEqual(round(discounted_values[0], 2), 22000.0)
+        self.assertEqual(round(discounted_values[2], 2), 19215.65)
+
+    def test_discount_values_different_lengths(self):
+        """Test the discounted values of inputs with different lengths."""
+        with self.assertRaises(ValueError):
+            compute_discount_values([70000, 70000], [48000], 7.0)
+
+        with self.assertRaises(ValueError):
+            compute_discount_values([70000, 70000], [48000, 48000], 7.0, [1])
+
     def test_npv_min_max_calculation(self):
         """Test the computation of min/max NPV values in the collection."""
         npv_collection = get_activity_npv_collection()
@@ -0,0 +1,496 @@
+# coding=utf-8
+"""Tests for the block-wise raster calculations.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from osgeo import gdal
+
+from qgis.core import QgsFeedback
+
+from cplus_plugin.lib.raster import (
+    align_raster,
+    calculate_highest_position,
+    calculate_pathway_carbon,
+    calculate_raster_mean,
+    calculate_weighted_sum,
+    create_virtual_raster,
+    mask_zero_values,
+    normalize_raster,
+    normalize_weight_raster,
+    parse_extent,
+    raster_band_statistics,
+    raster_metadata,
+    raster_nodata_value,
+    rasters_aligned,
+    OUTPUT_NODATA_VALUE,
+    QUANTIZED_NODATA_VALUE,
+)
+
+
+def create_raster(path, values, nodata_value=None, geo_transform=None):
+    """Creates a single band Float32 raster with the passed values."""
+    rows, columns = values.shape
+    dataset = gdal.GetDriverByName("GTiff").Create(
+        path, columns, rows, 1, gdal.GDT_Float32
+    )
+    dataset.SetGeoTransform(geo_transform or (0.0, 1.0, 0.0, rows, 0.0, -1.0))
+    band = dataset.GetRasterBand(1)
+    if nodata_value is not None:
+        band.SetNoDataValue(nodata_value)
+    band.WriteArray(values)
+    band.FlushCache()
+    dataset = None
+
+    return path
+
+
+def read_raster(path):
+    """Reads the first band values of the raster in the passed path."""
+    dataset = gdal.Open(path)
+    values = dataset.GetRasterBand(1).ReadAsArray()
+    dataset = None
+
+    return values
+
+
+class RasterCalculationTest(unittest.TestCase):
+    """Tests for the block-wise raster calculations."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_parse_extent(self):
+        """Test parsing of the processing extent strings."""
+        self.assertEqual(parse_extent("0,4,1,5 [EPSG:4326]"), (0.0, 4.0, 1.0, 5.0))
+        self.assertIsNone(parse_extent("0,4 [EPSG:4326]"))
+        self.assertIsNone(parse_extent(None))
+
+    def test_rasters_aligned(self):
+        """Test checking whether rasters share the same grid."""
+        values = np.ones((4, 4), dtype=np.float32)
+        first_path = create_raster(os.path.join(self.directory, "a.tif"), values)
+        second_path = create_raster(os.path.join(self.directory, "b.tif"), values)
+        shifted_path = create_raster(
+            os.path.join(self.directory, "c.tif"),
+            values,
+            geo_transform=(1.0, 1.0, 0.0, 4.0, 0.0, -1.0),
+        )
+
+        self.assertTrue(rasters_aligned([first_path, second_path]))
+        self.assertTrue(rasters_aligned([first_path, second_path], "0,4,0,4 []"))
+        self.assertFalse(rasters_aligned([first_path, second_path], "0,8,0,4 []"))
+        self.assertFalse(rasters_aligned([first_path, shifted_path]))
+
+    def test_calculate_pathway_carbon(self):
+        """Test adding the carbon layers mean into a pathway layer."""
+        pathway_values = np.array([[1, 2], [3, -9999]], dtype=np.float32)
+        pathway_path = create_raster(
+            os.path.join(self.directory, "pathway.tif"), pathway_values, -9999
+        )
+        first_carbon_path = create_raster(
+            os.path.join(self.directory, "carbon_1.tif"),
+            np.array([[2, 2], [2, 2]], dtype=np.float32),
+        )
+        second_carbon_path = create_raster(
+            os.path.join(self.directory, "carbon_2.tif"),
+            np.array([[4, 4], [4, 4]], dtype=np.float32),
+        )
+        output_path = os.path.join(self.directory, "output.tif")
+
+        result = calculate_pathway_carbon(
+            pathway_path,
+            [first_carbon_path, second_carbon_path],
+            output_path,
+            2.0,
+            0.5,
+            2,
+        )
+
+        self.assertTrue(result)
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[3.5, 5.5], [7.5, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+        )
+
+    def test_calculate_pathway_without_carbon(self):
+        """Test that the carbon nodata is ignored without a carbon coefficient."""
+        pathway_path = create_raster(
+            os.path.join(self.directory, "pathway.tif"),
+            np.array([[1, 2], [3, 4]], dtype=np.float32),
+            -9999,
+        )
+        carbon_path = create_raster(
+            os.path.join(self.directory, "carbon.tif"),
+            np.array([[-9999, 2], [2, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "output.tif")
+
+        result = calculate_pathway_carbon(
+            pathway_path, [carbon_path], output_path, 2.0, 0.0, 1
+        )
+
+        self.assertTrue(result)
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[2, 4], [6, 8]], dtype=np.float32),
+        )
+
+    def test_calculate_highest_position(self):
+        """Test finding the position of the raster with the highest value."""
+        first_path = create_raster(
+            os.path.join(self.directory, "position_1.tif"),
+            np.array([[1, 5], [-9999, -9999]], dtype=np.float32),
+            -9999,
+        )
+        second_path = create_raster(
+            os.path.join(self.directory, "position_2.tif"),
+            np.array([[3, 5], [2, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "highest_position.tif")
+
+        self.assertTrue(
+            calculate_highest_position([first_path, second_path], output_path)
+        )
+
+        dataset = gdal.Open(output_path)
+        band = dataset.GetRasterBand(1)
+        self.assertEqual(band.DataType, gdal.GDT_Int32)
+        np.testing.assert_array_equal(
+            band.ReadAsArray(), np.array([[2, 1], [2, OUTPUT_NODATA_VALUE]])
+        )
+        dataset = None
+
+    def test_calculate_raster_mean(self):
+        """Test averaging rasters with a custom divisor."""
+        first_path = create_raster(
+            os.path.join(self.directory, "mean_1.tif"),
+            np.array([[2, 4], [6, -9999]], dtype=np.float32),
+            -9999,
+        )
+        second_path = create_raster(
+            os.path.join(self.directory, "mean_2.tif"),
+            np.array([[4, 4], [6, 8]], dtype=np.float32),
+        )
+        output_path = os.path.join(self.directory, "mean.tif")
+
+        self.assertTrue(
+            calculate_raster_mean([first_path, second_path], output_path, count=3)
+        )
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[2.0, 8.0 / 3.0], [4.0, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+            rtol=1e-6,
+        )
+
+    def test_calculate_weighted_sum(self):
+        """Test the weighted sum of rasters."""
+        first_path = create_raster(
+            os.path.join(self.directory, "weighted_1.tif"),
+            np.array([[1, 2], [3, -9999]], dtype=np.float32),
+            -9999,
+        )
+        second_path = create_raster(
+            os.path.join(self.directory, "weighted_2.tif"),
+            np.array([[2, 2], [4, 4]], dtype=np.float32),
+        )
+        output_path = os.path.join(self.directory, "weighted_sum.tif")
+
+        self.assertTrue(
+            calculate_weighted_sum([first_path, second_path], output_path, [1.0, 0.5])
+        )
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[2.0, 3.0], [5.0, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+        )
+
+    def test_normalize_raster(self):
+        """Test normalizing a raster using its minimum and maximum values."""
+        input_path = create_raster(
+            os.path.join(self.directory, "input.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "normalized.tif")
+
+        result = normalize_raster(input_path, output_path, 1.0, 5.0, 2.0)
+
+        self.assertTrue(result)
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[0.0, 1.0], [2.0, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+        )
+
+    def test_normalize_constant_raster(self):
+        """Test normalizing a raster with equal minimum and maximum values."""
+        input_path = create_raster(
+            os.path.join(self.directory, "constant.tif"),
+            np.array([[2, 2], [2, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "constant_normalized.tif")
+
+        self.assertTrue(normalize_raster(input_path, output_path, 2.0, 2.0))
+        np.testing.assert_allclose(
+            read_raster(output_path), np.full((2, 2), OUTPUT_NODATA_VALUE)
+        )
+
+        dataset = gdal.Open(output_path)
+        stored_values = dataset.GetRasterBand(1).GetStatistics(False, False)
+        dataset = None
+        # Without valid values no statistics are stored
+        self.assertFalse(stored_values and stored_values[3] >= 0)
+
+    def test_normalize_raster_statistics(self):
+        """Test the statistics stored with the block-wise calculation outputs."""
+        input_path = create_raster(
+            os.path.join(self.directory, "statistics_input.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "statistics_normalized.tif")
+        quantized_path = os.path.join(self.directory, "statistics_quantized.tif")
+
+        self.assertTrue(normalize_raster(input_path, output_path, 1.0, 5.0, 2.0))
+        self.assertTrue(
+            normalize_raster(input_path, quantized_path, 1.0, 5.0, 2.0, quantize=True)
+        )
+
+        dataset = gdal.Open(output_path)
+        stored_values = dataset.GetRasterBand(1).GetStatistics(False, False)
+        dataset = None
+        np.testing.assert_allclose(stored_values[:3], [0.0, 2.0, 1.0])
+
+        statistics = raster_band_statistics(quantized_path)
+        self.assertAlmostEqual(statistics.minimum, 0.0, places=4)
+        self.assertAlmostEqual(statistics.maximum, 2.0, places=4)
+        self.assertAlmostEqual(statistics.mean, 1.0, places=4)
+
+    def test_normalize_raster_quantized(self):
+        """Test normalizing a raster into quantized values."""
+        input_path = create_raster(
+            os.path.join(self.directory, "quantize_input.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+        output_path = os.path.join(self.directory, "quantized.tif")
+
+        result = normalize_raster(input_path, output_path, 1.0, 5.0, 2.0, quantize=True)
+
+        self.assertTrue(result)
+
+        dataset = gdal.Open(output_path)
+        band = dataset.GetRasterBand(1)
+        self.assertEqual(band.DataType, gdal.GDT_UInt16)
+        self.assertEqual(band.GetNoDataValue(), QUANTIZED_NODATA_VALUE)
+
+        values = band.ReadAsArray()
+        self.assertEqual(values[1, 1], QUANTIZED_NODATA_VALUE)
+        np.testing.assert_allclose(
+            values[0].astype(np.float64) * band.GetScale() + band.GetOffset(),
+            np.array([0.0, 1.0]),
+            atol=1e-4,
+        )
+        dataset = None
+
+    def test_normalize_weight_raster(self):
+        """Test normalizing and weighting a raster in a single pass."""
+        input_path = create_raster(
+            os.path.join(self.directory, "activity.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+        weight_path = create_raster(
+            os.path.join(self.directory, "weight.tif"),
+            np.array([[1, -9999], [2, 2]], dtype=np.float32),
+            -9999,
+        )
+        normalized_path = os.path.join(self.directory, "activity_normalized.tif")
+        weighted_path = os.path.join(self.directory, "activity_weighted.tif")
+
+        result = normalize_weight_raster(
+            input_path,
+            [weight_path, weight_path],
+            [0.5, 1.0],
+            normalized_path,
+            weighted_path,
+            1.0,
+            5.0,
+            2.0,
+        )
+
+        self.assertTrue(result)
+        np.testing.assert_allclose(
+            read_raster(normalized_path),
+            np.array([[0.0, 1.0], [2.0, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+        )
+        np.testing.assert_allclose(
+            read_raster(weighted_path),
+            np.array(
+                [[1.5, OUTPUT_NODATA_VALUE], [5.0, OUTPUT_NODATA_VALUE]],
+                dtype=np.float32,
+            ),
+        )
+
+    def test_mask_zero_values(self):
+        """Test setting the zero values of a raster as nodata in place."""
+        path = create_raster(
+            os.path.join(self.directory, "weighted.tif"),
+            np.array([[0, 2], [4, -9999]], dtype=np.float32),
+            -9999,
+        )
+
+        self.assertTrue(mask_zero_values(path))
+
+        dataset = gdal.Open(path)
+        band = dataset.GetRasterBand(1)
+        self.assertEqual(band.GetNoDataValue(), 0)
+        np.testing.assert_allclose(
+            band.ReadAsArray(), np.array([[0, 2], [4, 0]], dtype=np.float32)
+        )
+        np.testing.assert_allclose(band.GetStatistics(False, False)[:3], [2, 4, 3])
+        dataset = None
+
+    def test_mask_zero_values_cancelled(self):
+        """Test cancelling the zero values masking after a rewritten window."""
+        path = os.path.join(self.directory, "cancelled.tif")
+        dataset = gdal.GetDriverByName("GTiff").Create(
+            path,
+            32,
+            32,
+            1,
+            gdal.GDT_Float32,
+            ["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+        )
+        dataset.SetGeoTransform((0.0, 1.0, 0.0, 32.0, 0.0, -1.0))
+        band = dataset.GetRasterBand(1)
+        band.SetNoDataValue(-9999)
+        band.WriteArray(np.full((32, 32), -9999, dtype=np.float32))
+        band = None
+        dataset = None
+
+        feedback = QgsFeedback()
+        feedback.progressChanged.connect(lambda _: feedback.cancel())
+
+        # The masking continues to the end once a window is rewritten
+        self.assertTrue(mask_zero_values(path, feedback))
+
+        dataset = gdal.Open(path)
+        band = dataset.GetRasterBand(1)
+        self.assertEqual(band.GetNoDataValue(), 0)
+        np.testing.assert_allclose(band.ReadAsArray(), np.zeros((32, 32)))
+        dataset = None
+
+    def test_quantized_raster_input(self):
+        """Test reading quantized rasters in the block-wise calculations."""
+        input_path = create_raster(
+            os.path.join(self.directory, "quantized_input.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+        quantized_path = os.path.join(self.directory, "quantized_activity.tif")
+        output_path = os.path.join(self.directory, "quantized_weighted.tif")
+
+        self.assertTrue(
+            normalize_raster(input_path, quantized_path, 1.0, 5.0, 2.0, quantize=True)
+        )
+        self.assertTrue(calculate_weighted_sum([quantized_path], output_path, [2.0]))
+        np.testing.assert_allclose(
+            read_raster(output_path),
+            np.array([[0.0, 2.0], [4.0, OUTPUT_NODATA_VALUE]], dtype=np.float32),
+            atol=1e-3,
+        )
+
+    def test_create_virtual_raster(self):
+        """Test creating a virtual raster of another raster."""
+        values = np.array([[1, 2], [3, -9999]], dtype=np.float32)
+        input_path = create_raster(
+            os.path.join(self.directory, "pathway_source.tif"), values, -9999
+        )
+        output_path = os.path.join(self.directory, "pathway_virtual.vrt")
+
+        self.assertTrue(create_virtual_raster(input_path, output_path))
+        np.testing.assert_allclose(read_raster(output_path), values)
+        self.assertEqual(raster_nodata_value(output_path), -9999)
+        self.assertFalse(mask_zero_values(output_path))
+
+    def test_align_raster(self):
+        """Test aligning rasters to the analysis grid."""
+        values = np.arange(16, dtype=np.float32).reshape(4, 4)
+        input_path = create_raster(
+            os.path.join(self.directory, "align_source.tif"), values, -9999
+        )
+        output_path = os.path.join(self.directory, "align_output.vrt")
+
+        # Rasters on the grid are used directly
+        self.assertEqual(
+            align_raster(input_path, output_path, "", (0, 0, 4, 4), 1.0, 1.0),
+            input_path,
+        )
+
+        # Rasters sharing the grid are cropped
+        self.assertEqual(
+            align_raster(input_path, output_path, "", (1, 1, 3, 3), 1.0, 1.0),
+            output_path,
+        )
+        np.testing.assert_allclose(read_raster(output_path), values[1:3, 1:3])
+
+        # Rasters with a different resolution are resampled
+        resampled_path = os.path.join(self.directory, "align_resampled.vrt")
+        self.assertEqual(
+            align_raster(input_path, resampled_path, "", (0, 0, 4, 4), 2.0, 2.0),
+            resampled_path,
+        )
+        self.assertEqual(read_raster(resampled_path).shape, (2, 2))
+        self.assertEqual(raster_nodata_value(resampled_path), -9999)
+
+    def test_raster_metadata(self):
+        """Test reading the raster spatial metadata."""
+        input_path = create_raster(
+            os.path.join(self.directory, "metadata.tif"),
+            np.ones((4, 2), dtype=np.float32),
+            geo_transform=(10.0, 2.0, 0.0, 20.0, 0.0, -0.5),
+        )
+
+        metadata = raster_metadata(input_path)
+
+        self.assertEqual(metadata.x_res, 2.0)
+        self.assertEqual(metadata.y_res, 0.5)
+        self.assertEqual(
+            (metadata.x_min, metadata.y_min, metadata.x_max, metadata.y_max),
+            (10.0, 18.0, 14.0, 20.0),
+        )
+        self.assertIsNone(raster_metadata(os.path.join(self.directory, "none.tif")))
+
+    def test_raster_cached_values(self):
+        """Test the cached raster nodata value and band statistics."""
+        input_path = create_raster(
+            os.path.join(self.directory, "statistics.tif"),
+            np.array([[1, 3], [5, -9999]], dtype=np.float32),
+            -9999,
+        )
+
+        self.assertEqual(raster_nodata_value(input_path), -9999)
+
+        statistics = raster_band_statistics(input_path)
+        self.assertEqual(statistics.minimum, 1.0)
+        self.assertEqual(statistics.maximum, 5.0)
+        self.assertIs(raster_band_statistics(input_path), statistics)
+
+        approximate_statistics = raster_band_statistics(input_path, approximate=True)
+        self.assertEqual(approximate_statistics.minimum, 1.0)
+        self.assertEqual(approximate_statistics.maximum, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
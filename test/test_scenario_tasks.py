@@ -6,13 +6,15 @@
 import unittest
 
 import os
+import shutil
+import tempfile
 import uuid
 import processing
 import datetime
 
 from processing.core.Processing import Processing
 
-from qgis.core import Qgis, QgsRasterLayer, QgsVectorLayer, QgsWkbTypes
+from qgis.core import Qgis, QgsRasterLayer, QgsRectangle, QgsVectorLayer, QgsWkbTypes
 
 from cplus_plugin.conf import settings_manager, Settings
 
@@ -23,6 +25,8 @@ from cplus_plugin.models.base import Scenario, NcsPathway, Activity
 class ScenarioAnalysisTaskTest(unittest.TestCase):
     def setUp(self):
         Processing.initialize()
+        self.cache_directory = tempfile.mkdtemp()
+        self.base_dir = settings_manager.get_value(Settings.BASE_DIR)
 
     def test_scenario_pathways_analysis(self):
         pathway_layer_directory = os.path.join(
@@ -714,5 +718,153 @@ class ScenarioAnalysisTaskTest(unittest.TestCase):
 
         self.assertTrue(result_layer.isValid())
 
+    def test_scenario_snap_cache(self):
+        pathway_layer_directory = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "data", "pathways", "layers"
+        )
+
+        pathway_layer_path = os.path.join(pathway_layer_directory, "test_pathway_1.tif")
+        reference_layer_path = os.path.join(
+            pathway_layer_directory, "test_pathway_2.tif"
+        )
+
+        settings_manager.set_value(Settings.BASE_DIR, self.cache_directory)
+
+        analysis_task = ScenarioAnalysisTask(
+            "test_scenario_snap_cache",
+            "test_scenario_snap_cache_description",
+            [],
+            [],
+            None,
+            None,
+        )
+
+        cache_key = analysis_task.snap_cache_key(
+            pathway_layer_path, reference_layer_path, "0,1,0,1", False, 0, -9999
+        )
+
+        self.assertIsNotNone(cache_key)
+        self.assertEqual(
+            cache_key,
+            analysis_task.snap_cache_key(
+                pathway_layer_path, reference_layer_path, "0,1,0,1", False, 0, -9999
+            ),
+        )
+        self.assertNotEqual(
+            cache_key,
+            analysis_task.snap_cache_key(
+                pathway_layer_path, reference_layer_path, "0,1,0,1", False, 1, -9999
+            ),
+        )
+        self.assertIsNone(
+            analysis_task.snap_cache_key(
+                "missing_layer.tif", reference_layer_path, "0,1,0,1", False, 0, -9999
+            )
+        )
+
+        analysis_task.add_cached_snap_layer(cache_key, pathway_layer_path)
+
+        self.assertEqual(
+            analysis_task.get_cached_snap_layer(cache_key), pathway_layer_path
+        )
+        self.assertTrue(os.path.exists(analysis_task.snap_cache_path()))
+
+    def test_scenario_cached_pathways_stage(self):
+        pathway_layer_directory = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "data", "pathways", "layers"
+        )
+
+        pathway_layer_path = os.path.join(pathway_layer_directory, "test_pathway_1.tif")
+        stage_output_path = os.path.join(pathway_layer_directory, "test_pathway_2.tif")
+
+        test_pathway = NcsPathway(
+            uuid=uuid.uuid4(),
+            name="test_pathway",
+            description="test_description",
+            path=pathway_layer_path,
+        )
+
+        test_activity = Activity(
+            uuid=uuid.uuid4(),
+            name="test_activity",
+            description="test_description",
+            pathways=[test_pathway],
+        )
+
+        settings_manager.set_value(Settings.BASE_DIR, self.cache_directory)
+
+        analysis_task = ScenarioAnalysisTask(
+            "test_scenario_cached_pathways_stage",
+            "test_scenario_cached_pathways_stage_description",
+            [test_activity],
+            [],
+            None,
+            None,
+        )
+        analysis_task.scenario_directory = os.path.join(
+            self.cache_directory, "scenario"
+        )
+
+        stage_runs = []
+
+        def stage():
+            stage_runs.append(test_pathway.path)
+            test_pathway.path = stage_output_path
+            return True
+
+        stage_name = "test_stage"
+
+        self.assertTrue(
+            analysis_task.run_cached_pathways_stage(stage_name, stage, [1.0])
+        )
+        self.assertEqual(len(stage_runs), 1)
+
+        # The second run with the same inputs reuses the first run outputs
+        test_pathway.path = pathway_layer_path
+        self.assertTrue(
+            analysis_task.run_cached_pathways_stage(stage_name, stage, [1.0])
+        )
+        self.assertEqual(len(stage_runs), 1)
+
+        # The reused outputs are linked into the scenario directory
+        self.assertEqual(
+            test_pathway.path,
+            os.path.join(
+                analysis_task.scenario_directory, "layers", "test_pathway_2.tif"
+            ),
+        )
+        self.assertTrue(os.path.exists(test_pathway.path))
+
+        # Changing the stage parameters runs the stage again
+        test_pathway.path = pathway_layer_path
+        analysis_task.run_cached_pathways_stage(stage_name, stage, [2.0])
+        self.assertEqual(len(stage_runs), 2)
+
+    def test_scenario_align_extent(self):
+        analysis_task = ScenarioAnalysisTask(
+            "test_scenario_align_extent",
+            "test_scenario_align_extent_description",
+            [],
+            [],
+            None,
+            None,
+        )
+
+        aligned_extent = analysis_task.align_extent(
+            QgsRectangle(0.0, 0.0, 10.0, 10.0),
+            0.1,
+            0.1,
+            QgsRectangle(1.25, 2.3, 5.75, 7.3),
+        )
+
+        self.assertAlmostEqual(aligned_extent.xMinimum(), 1.2)
+        self.assertAlmostEqual(aligned_extent.xMaximum(), 5.8)
+        self.assertAlmostEqual(aligned_extent.yMinimum(), 2.3)
+        self.assertAlmostEqual(aligned_extent.yMaximum(), 7.3)
+
     def tearDown(self):
-        pass
+        if self.base_dir is None:
+            settings_manager.remove(Settings.BASE_DIR)
+        else:
+            settings_manager.set_value(Settings.BASE_DIR, self.base_dir)
+        shutil.rmtree(self.cache_directory, ignore_errors=True)